@@ -4,32 +4,61 @@ Shopping Browser Adapter Registry.
 Maps site names to their ShopperBase implementations.
 """
 
-from .amazon import AmazonShopper
+import importlib
+from functools import lru_cache
 
-ADAPTERS = {
-    "amazon": AmazonShopper,
-}
+# Resolved adapter classes, filled in on first use by get_adapter()
+ADAPTERS = {}
 
 # Lazily imported to avoid requiring all dependencies at startup
 _LAZY_ADAPTERS = {
+    "amazon": ("adapters.amazon", "AmazonShopper"),
     "newegg": ("adapters.newegg", "NeweggShopper"),
 }
 
+# Each site's DOMAIN, readable without importing the adapter (the CLI uses it
+# to prewarm the pool before any adapter is loaded)
+_SITE_DOMAINS = {
+    "amazon": "amazon.com",
+    "newegg": "newegg.com",
+}
 
-def get_adapter(site: str):
-    """Get adapter class by site name."""
+# Every known site name, sorted once at import time
+_ALL_NAMES = tuple(sorted({*ADAPTERS, *_LAZY_ADAPTERS}))
+
+
+@lru_cache(maxsize=None)
+def _resolve(site: str):
+    """Import and return the adapter class for a site (memoized)."""
     if site in ADAPTERS:
         return ADAPTERS[site]
     if site in _LAZY_ADAPTERS:
         module_path, class_name = _LAZY_ADAPTERS[site]
-        import importlib
         mod = importlib.import_module(f".{module_path.split('.')[-1]}", package=__package__)
         cls = getattr(mod, class_name)
         ADAPTERS[site] = cls
         return cls
-    raise ValueError(f"Unknown site: {site}. Available: {list(ADAPTERS.keys()) + list(_LAZY_ADAPTERS.keys())}")
+    raise ValueError(f"Unknown site: {site}. Available: {list(_ALL_NAMES)}")
+
 
+def get_adapter(site: str):
+    """Get adapter class by site name."""
+    return _resolve(site)
+
+
+def get_domain(site: str) -> str | None:
+    """Domain for a site name, without importing its adapter."""
+    return _SITE_DOMAINS.get(site)
 
-def list_sites() -> list[str]:
+
+def list_sites() -> tuple[str, ...]:
     """List all available site names."""
-    return sorted(set(list(ADAPTERS.keys()) + list(_LAZY_ADAPTERS.keys())))
+    return _ALL_NAMES
+
+
+def __getattr__(name: str):
+    """Resolve adapter classes (e.g. ``adapters.AmazonShopper``) on first access."""
+    for site, (_, class_name) in _LAZY_ADAPTERS.items():
+        if class_name == name:
+            return get_adapter(site)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
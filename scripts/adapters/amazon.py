@@ -6,19 +6,457 @@ enriched data extraction, and fixed title selectors.
 """
 
 import urllib.parse
-from pathlib import Path
 
-from base import ShopperBase
+from base import CartResult, PriceResult, SearchResult, ShopperBase
+
+# Fields the search extractor can emit, in default output order.
+_SEARCH_FIELDS = (
+    "asin", "title", "price", "list_price", "rating", "reviews",
+    "prime", "deal_badge", "url",
+)
+
+
+def _rows_from_columns(fields: list, columns: list) -> list:
+    """Reassemble per-result dicts from _SEARCH_JS's columnar payload."""
+    return [dict(zip(fields, values)) for values in zip(*columns)]
+
+
+# Page extractors: constant JS function sources, registered on
+# AmazonShopper.EXTRACTORS and installed once per tab. Call-time inputs
+# (limit, fields) are passed as JSON arguments via ShopperBase.js_call().
+
+# Top-level constants and helpers shared by the extractors. Defined once per
+# document in the installed bundle; the extractor functions close over them.
+_PRELUDE_JS = """
+    const PRICE_RE = /\\$[\\d,]+/;
+
+    // Every selector the extractors use, as one frozen object.
+    const SEL = Object.freeze({
+        searchCard: '[data-component-type="s-search-result"]',
+        // Per-card lookups on the search page (see grab()).
+        searchFields: Object.freeze({
+            titleLink: '[data-cy="title-recipe"] a',
+            h2: 'h2',
+            h2Link: 'h2 a',
+            truncFull: 'h2 .a-truncate-full',
+            textNormal: 'h2 .a-text-normal',
+            offscreen: '.a-price .a-offscreen',
+            priceWhole: '.a-price .a-price-whole',
+            priceFrac: '.a-price .a-price-fraction',
+            rating: '.a-icon-alt',
+            reviewsLink: 'a[href*="customerReviews"], a[href*="#reviews"]',
+            reviewsAlt: '[aria-label*="stars"] + span',
+            prime: '[aria-label="Amazon Prime"], .s-prime',
+            deal: '.a-badge-text, .a-badge-label-inner',
+            listPrice: '.a-text-price .a-offscreen',
+        }),
+        // Cascades, highest priority first (see pick()).
+        priceCascade: Object.freeze([
+            '.priceToPay .a-offscreen',
+            '#corePrice_feature_div .a-offscreen',
+            '#apex_offerDisplay_desktop .a-offscreen',
+            '.a-price .a-offscreen',
+        ]),
+        sellerCascade: Object.freeze([
+            '#merchant-info',
+            '#sellerProfileTriggerId',
+            '#tabular-buybox .tabular-buybox-text[tabular-attribute-name="Sold by"] a',
+            '#buyBoxAccordion [tabular-attribute-name="Sold by"] a',
+        ]),
+        // Single-element lookups on the product page (see grab()).
+        product: Object.freeze({
+            asin: 'input[name="ASIN"]',
+            rating: '#acrPopover .a-icon-alt',
+            deal: '#dealBadge_feature_div .a-badge-text, .a-badge-label-inner',
+            discount: '.savingsPercentage',
+            listPrice: '.a-text-price .a-offscreen',
+            coupon: '#couponBadge .a-color-success',
+            prime: '#primeFactsDesktop_feature_div [aria-label="Amazon Prime"], [aria-label="Amazon Prime"]',
+        }),
+        productIds: Object.freeze([
+            'productTitle', 'availability', 'add-to-cart-button',
+            'acrCustomerReviewText', 'mir-layout-DELIVERY_BLOCK',
+            'deliveryMessageMirId',
+        ]),
+        features: '#feature-bullets li span.a-list-item',
+        altImages: '#altImages .a-button-thumbnail img',
+        cartCountId: 'nav-cart-count',
+        cartItems: '.sc-list-item:not(.sc-list-item-removed)',
+        orderCards: '.order-card, .js-order-card',
+        productLinks: 'a[href*="/dp/"], a[href*="/gp/product/"]',
+    });
+
+    // Highest-priority match for a selector cascade, from a single
+    // combined querySelectorAll. `accept` filters candidates.
+    const pick = (sels, accept = () => true) => {
+        let best = null, bestRank = sels.length;
+        for (const el of document.querySelectorAll(sels.join(', '))) {
+            const rank = sels.findIndex(s => el.matches(s));
+            if (rank < bestRank && accept(el)) {
+                best = el;
+                bestRank = rank;
+                if (rank === 0) break;
+            }
+        }
+        return best;
+    };
+
+    // textContent + whitespace collapse instead of innerText, which
+    // forces a layout pass.
+    const norm = el => el ? el.textContent.replace(/\\s+/g, ' ').trim() : '';
+
+    // id → element for a batch of ids.
+    const byIds = ids => Object.fromEntries(ids.map(id => [id, document.getElementById(id)]));
+
+    const cartCount = () =>
+        document.getElementById(SEL.cartCountId)?.textContent?.trim() || '0';
+
+    // key → first element (document order) under `root` matching spec[key],
+    // from one combined querySelectorAll: what root.querySelector(spec[key])
+    // returns. Entries and the combined selector are computed once per spec.
+    const grabPlans = new WeakMap();
+    const grab = (spec, root = document) => {
+        let plan = grabPlans.get(spec);
+        if (!plan) {
+            const entries = Object.entries(spec);
+            plan = { entries, combined: entries.map(e => e[1]).join(', ') };
+            grabPlans.set(spec, plan);
+        }
+        const hit = {};
+        let found = 0;
+        for (const el of root.querySelectorAll(plan.combined)) {
+            for (const [key, sel] of plan.entries) {
+                if (!hit[key] && el.matches(sel)) {
+                    hit[key] = el;
+                    found++;
+                }
+            }
+            if (found === plan.entries.length) break;
+        }
+        return hit;
+    };
+"""
+
+_SEARCH_JS = """
+    (limit, fields) => {
+        // Columnar output: one array per requested field, so the payload
+        // carries no per-result keys and only the columns asked for.
+        const ALL = ['asin', 'title', 'price', 'list_price', 'rating',
+                     'reviews', 'prime', 'deal_badge', 'url'];
+        const picks = fields.map(f => ALL.indexOf(f));
+        const columns = fields.map(() => []);
+        let count = 0;
+
+        const cards = document.querySelectorAll(SEL.searchCard);
+        for (const card of cards) {
+            if (count >= limit) break;
+            const asin = card.dataset.asin;
+            if (!asin) continue;
+
+            // One combined querySelectorAll per card instead of ~12
+            // querySelector walks.
+            const hit = grab(SEL.searchFields, card);
+
+            // Title: Amazon now splits brand (h2) from product name
+            // ([data-cy="title-recipe"] a). Try full title first.
+            let title = hit.titleLink?.textContent?.trim() || null;
+            if (!title && hit.h2) {
+                title = (hit.truncFull?.textContent?.trim()) ||
+                        (hit.textNormal?.textContent?.trim()) ||
+                        hit.h2.textContent?.trim() || null;
+            }
+            if (title && title.length < 5) title = null;
+
+            const linkEl = hit.titleLink || hit.h2Link;
+            const href = linkEl ? linkEl.href : null;
+
+            // Price: prefer .a-offscreen (pre-formatted), fallback to whole+fraction
+            let price = hit.offscreen ? hit.offscreen.textContent.trim() : null;
+            if (!price && hit.priceWhole) {
+                price = '$' + hit.priceWhole.textContent.trim() +
+                        (hit.priceFrac ? hit.priceFrac.textContent.trim() : '00');
+            }
+
+            const rating = hit.rating ? hit.rating.textContent.trim() : null;
+            // Reviews: try adjacent span, then aria-label count
+            const reviewsEl = hit.reviewsLink || hit.reviewsAlt;
+            const reviews = reviewsEl ? reviewsEl.textContent.trim() : null;
+            const primeEl = hit.prime;
+            const dealEl = hit.deal;
+            const listPriceText = hit.listPrice?.textContent?.trim() || null;
+
+            const row = [
+                asin, title, price, listPriceText, rating, reviews,
+                !!primeEl, dealEl ? dealEl.textContent.trim() : null, href
+            ];
+            for (let c = 0; c < picks.length; c++) columns[c].push(row[picks[c]]);
+            count++;
+        }
+
+        return {
+            fields: fields,
+            columns: columns
+        };
+    }
+"""
+
+# Shared product-page extraction (price/seller cascades, availability,
+# shipping, badges, rating). check_price returns it as is; product_details
+# extends it with brand, features and images.
+_BASE_PRODUCT_JS = """
+    () => {
+        const byId = byIds(SEL.productIds);
+        const hit = grab(SEL.product);
+        const text = el => el ? el.textContent.trim() : null;
+
+        // Price: require actual price text (not just element existence)
+        // because some .a-offscreen elements exist but have empty text
+        const priceEl = pick(SEL.priceCascade, el => PRICE_RE.test(el.textContent));
+        const price = priceEl ? priceEl.textContent.trim() : null;
+
+        const availability = norm(byId['availability']) || null;
+
+        // Seller: cascade through possible containers
+        const sellerEl = pick(SEL.sellerCascade);
+        let seller = sellerEl ? sellerEl.textContent.trim() : null;
+        if (seller && seller.length < 2) seller = null;
+
+        // Shipping: get full delivery text, not just bold portion
+        const deliveryBlock = byId['mir-layout-DELIVERY_BLOCK'] || byId['deliveryMessageMirId'];
+        // First non-empty block inside it: what innerText's first line was.
+        let shipping = null;
+        if (deliveryBlock) {
+            for (const child of deliveryBlock.children) {
+                shipping = norm(child);
+                if (shipping) break;
+            }
+            shipping = shipping || norm(deliveryBlock) || null;
+        }
+
+        const listPriceRaw = text(hit.listPrice);
+        const listPrice = (listPriceRaw && PRICE_RE.test(listPriceRaw)) ? listPriceRaw : null;
+
+        return {
+            asin: hit.asin?.value || null,
+            title: text(byId['productTitle']),
+            price: price,
+            list_price: listPrice,
+            discount_pct: text(hit.discount),
+            availability: availability,
+            in_stock: !!byId['add-to-cart-button'],
+            prime: !!hit.prime,
+            seller: seller,
+            shipping: shipping,
+            deal_badge: text(hit.deal),
+            coupon: text(hit.coupon),
+            rating: text(hit.rating),
+            reviews: text(byId['acrCustomerReviewText']),
+            url: window.location.href
+        };
+    }
+"""
+
+_CHECK_PRICE_JS = _BASE_PRODUCT_JS
+
+_PRODUCT_DETAILS_JS = """
+    () => {
+        const { asin, title, url, ...core } = (""" + _BASE_PRODUCT_JS + """)();
+
+        const features = [];
+        document.querySelectorAll(SEL.features).forEach(el => {
+            const text = el.textContent.trim();
+            if (text) features.push(text);
+        });
+
+        const brandEl = document.getElementById('bylineInfo');
+        const brand = brandEl ? brandEl.textContent.trim() : null;
+
+        const images = [];
+        document.querySelectorAll(SEL.altImages).forEach(img => {
+            const src = img.src?.replace(/\\._.*_\\./, '.');
+            if (src) images.push(src);
+        });
+
+        return {
+            asin: asin,
+            title: title,
+            brand: brand,
+            ...core,
+            features: features,
+            image_count: images.length,
+            url: url
+        };
+    }
+"""
+
+_ADD_TO_CART_JS = """
+    () => {
+        const title = document.getElementById('productTitle');
+        const btn = document.getElementById('add-to-cart-button');
+        if (!title) return { error: 'Product page not found' };
+        if (!btn) return { error: 'Product not available for purchase' };
+        const countBefore = cartCount();
+        btn.click();
+        return {
+            clicked: true,
+            cart_count_before: countBefore,
+            product: title.textContent.trim()
+        };
+    }
+"""
+
+_CART_COUNT_JS = """
+    () => cartCount()
+"""
 
-SCREENSHOT_DIR = Path(__file__).parent.parent.parent / "data" / "screenshots"
+# Resolves as soon as the cart badge changes from its pre-click value
+# (MutationObserver on #nav-cart-count), capped at 4s.
+_CART_COUNT_AFTER_CLICK_JS = """
+    async (before) => {
+        const read = cartCount;
+        const el = document.getElementById(SEL.cartCountId);
+        if (!el) {
+            await new Promise(r => setTimeout(r, 500));
+        } else if (read() === before) {
+            await new Promise(resolve => {
+                const mo = new MutationObserver(() => {
+                    if (read() !== before) done();
+                });
+                const timer = setTimeout(() => done(), 4000);
+                const done = () => {
+                    mo.disconnect();
+                    clearTimeout(timer);
+                    resolve();
+                };
+                // Watch the badge's container too, in case the badge is re-rendered.
+                mo.observe(el.parentElement || el, { characterData: true, childList: true, subtree: true });
+            });
+        }
+        return read();
+    }
+"""
 
+_VIEW_CART_JS = """
+    () => {
+        const count = cartCount();
+        const items = [];
+        document.querySelectorAll(SEL.cartItems).forEach(item => {
+            const titleEl = item.querySelector('.sc-product-title, .a-truncate-full');
+            const priceEl = item.querySelector('.sc-product-price, .sc-price');
+            const qtyEl = item.querySelector('.sc-quantity-textfield');
+            const asinEl = item.closest('[data-asin]');
+            if (titleEl) {
+                items.push({
+                    title: titleEl.textContent.trim(),
+                    price: priceEl ? priceEl.textContent.trim() : null,
+                    quantity: qtyEl ? qtyEl.value : '1',
+                    asin: asinEl ? asinEl.dataset.asin : null
+                });
+            }
+        });
+        const subtotalEl = document.getElementById('sc-subtotal-amount-activecart');
+        const subtotal = subtotalEl ? subtotalEl.textContent.trim() : null;
+        return {
+            cart_count: count,
+            items: items,
+            subtotal: subtotal,
+            url: window.location.href
+        };
+    }
+"""
+
+_MY_ORDERS_JS = """
+    (() => {
+        // Order ids and order dates in one alternation, compiled once when
+        // the extractor is defined rather than on every call.
+        const ORDER_TOKEN_RE = /(\\d{3}-\\d{7}-\\d{7})|((?:January|February|March|April|May|June|July|August|September|October|November|December)\\s+\\d{1,2},\\s+\\d{4})/g;
+
+        return (limit) => {
+            // Scan only the order cards' text (textContent: no layout flush),
+            // falling back to the whole body if the card markup changes.
+            const cards = document.querySelectorAll(SEL.orderCards);
+            const allText = cards.length
+                ? Array.from(cards, c => c.textContent).join('\\n')
+                : document.body.textContent;
+
+            // Single exec() scan, sorting captures into order ids vs dates.
+            // Each set stops growing at `limit` and the scan ends as soon as
+            // both are full, so work and allocation are O(limit), not
+            // O(matches in the page).
+            const orderIdSet = new Set();
+            const dateSet = new Set();
+            ORDER_TOKEN_RE.lastIndex = 0;  // shared /g regex: reset per call
+            let m;
+            while ((m = ORDER_TOKEN_RE.exec(allText)) !== null) {
+                if (m[1]) {
+                    if (orderIdSet.size < limit) orderIdSet.add(m[1]);
+                } else if (dateSet.size < limit) {
+                    dateSet.add(m[2]);
+                }
+                if (orderIdSet.size >= limit && dateSet.size >= limit) break;
+            }
+            const orderIds = [...orderIdSet];
+            const dates = [...dateSet];
+
+            const productLinks = cards.length
+                ? Array.from(cards, c => Array.from(c.querySelectorAll(SEL.productLinks))).flat()
+                : document.querySelectorAll(SEL.productLinks);
+            const products = [];
+            const seen = new Set();
+            for (const link of productLinks) {
+                const text = link.textContent.trim();
+                if (text && text.length > 5 && text.length < 200 && !seen.has(text)) {
+                    seen.add(text);
+                    const asinMatch = link.href.match(/\\/dp\\/([A-Z0-9]{10})/);
+                    products.push({
+                        name: text,
+                        asin: asinMatch ? asinMatch[1] : null,
+                        url: link.href
+                    });
+                }
+                if (products.length >= limit) break;
+            }
+
+            return {
+                order_count: orderIds.length,
+                order_ids: orderIds,
+                products: products,
+                dates: dates,
+                url: window.location.href
+            };
+        };
+    })()
+"""
 
 class AmazonShopper(ShopperBase):
     DOMAIN = "amazon.com"
     DISPLAY_NAME = "Amazon"
+    PRODUCT_ID_KEY = "asin"
+
+    EXTRACTOR_PRELUDE = _PRELUDE_JS
+    EXTRACTORS = {
+        "search": _SEARCH_JS,
+        "check_price": _CHECK_PRICE_JS,
+        "product_details": _PRODUCT_DETAILS_JS,
+        "add_to_cart": _ADD_TO_CART_JS,
+        "cart_count": _CART_COUNT_JS,
+        "cart_count_after_click": _CART_COUNT_AFTER_CLICK_JS,
+        "view_cart": _VIEW_CART_JS,
+        "my_orders": _MY_ORDERS_JS,
+    }
+
+    async def search(self, query: str, limit: int = 5, screenshot: str = None,
+                     fields: tuple = None) -> SearchResult:
+        """Search Amazon products.
+
+        ``fields`` narrows each result to the named keys (any of
+        ``_SEARCH_FIELDS``); by default every field is returned.
+        """
+        fields = list(fields or _SEARCH_FIELDS)
+        unknown = [f for f in fields if f not in _SEARCH_FIELDS]
+        if unknown:
+            return {"success": False, "error": f"Unknown search fields: {', '.join(unknown)}"}
 
-    async def search(self, query: str, limit: int = 5, screenshot: str = None) -> dict:
-        """Search Amazon products."""
         await self.ensure_browser()
         if not self.browser:
             return {"success": False, "error": "Cookie extraction failed"}
@@ -26,186 +464,55 @@ class AmazonShopper(ShopperBase):
         try:
             encoded = urllib.parse.quote_plus(query)
             url = f"https://www.amazon.com/s?k={encoded}"
-            await self.navigate(url, wait=4)
+            data = await self._nav_and_eval(
+                url, self.js_call("search", limit, fields),
+                wait_selector='[data-component-type="s-search-result"]',
+            )
 
             if screenshot:
-                await self.page.save_screenshot(screenshot)
-
-            safe_query = query.replace("'", "\\'")
-            data = await self.evaluate(f"""
-                (() => {{
-                    const limit = {limit};
-                    const results = [];
-                    const cards = document.querySelectorAll('[data-component-type="s-search-result"]');
-                    for (const card of cards) {{
-                        if (results.length >= limit) break;
-                        const asin = card.dataset.asin;
-                        if (!asin) continue;
-
-                        // Title: Amazon now splits brand (h2) from product name
-                        // ([data-cy="title-recipe"] a). Try full title first.
-                        const titleRecipeLink = card.querySelector('[data-cy="title-recipe"] a');
-                        const h2 = card.querySelector('h2');
-                        let title = titleRecipeLink?.textContent?.trim() || null;
-                        if (!title && h2) {{
-                            const truncFull = h2.querySelector('.a-truncate-full');
-                            const textNormal = h2.querySelector('.a-text-normal');
-                            title = (truncFull?.textContent?.trim()) ||
-                                    (textNormal?.textContent?.trim()) ||
-                                    h2.textContent?.trim() || null;
-                        }}
-                        if (title && title.length < 5) title = null;
-
-                        const linkEl = titleRecipeLink || card.querySelector('h2 a');
-                        const href = linkEl ? linkEl.href : null;
-
-                        // Price: prefer .a-offscreen (pre-formatted), fallback to whole+fraction
-                        const offscreenPrice = card.querySelector('.a-price .a-offscreen');
-                        let price = offscreenPrice ? offscreenPrice.textContent.trim() : null;
-                        if (!price) {{
-                            const priceWhole = card.querySelector('.a-price .a-price-whole');
-                            const priceFrac = card.querySelector('.a-price .a-price-fraction');
-                            if (priceWhole) {{
-                                price = '$' + priceWhole.textContent.trim() +
-                                        (priceFrac ? priceFrac.textContent.trim() : '00');
-                            }}
-                        }}
-
-                        const ratingEl = card.querySelector('.a-icon-alt');
-                        const rating = ratingEl ? ratingEl.textContent.trim() : null;
-                        // Reviews: try adjacent span, then aria-label count
-                        const reviewsLink = card.querySelector('a[href*="customerReviews"], a[href*="#reviews"]');
-                        const reviewsEl = reviewsLink || card.querySelector('[aria-label*="stars"] + span');
-                        const reviews = reviewsEl ? reviewsEl.textContent.trim() : null;
-                        const primeEl = card.querySelector('[aria-label="Amazon Prime"], .s-prime');
-                        const dealEl = card.querySelector('.a-badge-text, .a-badge-label-inner');
-                        const listPriceEl = card.querySelector('.a-text-price .a-offscreen');
-                        const listPriceText = listPriceEl?.textContent?.trim() || null;
-
-                        results.push({{
-                            asin: asin,
-                            title: title,
-                            price: price,
-                            list_price: listPriceText,
-                            rating: rating,
-                            reviews: reviews,
-                            prime: !!primeEl,
-                            deal_badge: dealEl ? dealEl.textContent.trim() : null,
-                            url: href
-                        }});
-                    }}
-
-                    return {{
-                        query: '{safe_query}',
-                        result_count: results.length,
-                        results: results
-                    }};
-                }})()
-            """)
-
-            result = {"success": True}
-            result.update(data)
+                await self.save_screenshot(screenshot)
+
+            results = _rows_from_columns(data.get("fields", fields), data.get("columns", []))
+            result = {
+                "success": True,
+                "query": query,
+                "result_count": len(results),
+                "results": results,
+            }
             if screenshot:
                 result["screenshot"] = screenshot
             return result
 
         finally:
-            await self.close()
+            self._schedule_close()
 
-    async def check_price(self, product_id: str, screenshot: str = None) -> dict:
+    async def check_price(self, product_id: str, screenshot: str = None) -> PriceResult:
         """Get price/availability for a product by ASIN."""
         await self.ensure_browser()
         if not self.browser:
             return {"success": False, "error": "Cookie extraction failed"}
 
         try:
-            url = f"https://www.amazon.com/dp/{product_id}"
-            await self.navigate(url, wait=4)
+            return await self._check_price_on_page(self.page, product_id, screenshot)
+        finally:
+            self._schedule_close()
 
-            if screenshot:
-                await self.page.save_screenshot(screenshot)
-
-            data = await self.evaluate("""
-                (() => {
-                    const title = document.getElementById('productTitle');
-
-                    // Price: check each selector for actual price text (not just element existence)
-                    // because some .a-offscreen elements exist but have empty text
-                    let price = null;
-                    for (const sel of ['.priceToPay .a-offscreen',
-                                       '#corePrice_feature_div .a-offscreen',
-                                       '#apex_offerDisplay_desktop .a-offscreen',
-                                       '.a-price .a-offscreen']) {
-                        const el = document.querySelector(sel);
-                        const t = el?.textContent?.trim();
-                        if (t && t.match(/\\$[\\d,]+/)) { price = t; break; }
-                    }
-
-                    const availEl = document.getElementById('availability');
-                    let availability = null;
-                    if (availEl) {
-                        const lines = availEl.innerText.trim().split('\\n').filter(l => l.trim());
-                        availability = lines.join(' ').trim() || null;
-                    }
-
-                    const addBtn = document.getElementById('add-to-cart-button');
-                    const ratingEl = document.querySelector('#acrPopover .a-icon-alt');
-                    const reviewsEl = document.getElementById('acrCustomerReviewText');
-
-                    // Seller: cascade through possible containers
-                    const sellerEl = document.querySelector('#merchant-info') ||
-                                     document.querySelector('#sellerProfileTriggerId') ||
-                                     document.querySelector('#tabular-buybox .tabular-buybox-text[tabular-attribute-name="Sold by"] a') ||
-                                     document.querySelector('#buyBoxAccordion [tabular-attribute-name="Sold by"] a');
-                    let seller = sellerEl ? sellerEl.textContent.trim() : null;
-                    if (seller && seller.length < 2) seller = null;
-
-                    // Shipping: get full delivery text, not just bold portion
-                    const deliveryBlock = document.querySelector('#mir-layout-DELIVERY_BLOCK') ||
-                                          document.querySelector('#deliveryMessageMirId');
-                    let shipping = null;
-                    if (deliveryBlock) {
-                        const lines = deliveryBlock.innerText.trim().split('\\n').filter(l => l.trim());
-                        shipping = lines[0] || null;
-                    }
-
-                    const dealEl = document.querySelector('#dealBadge_feature_div .a-badge-text, .a-badge-label-inner');
-                    const discountEl = document.querySelector('.savingsPercentage');
-                    const _listPriceRaw = document.querySelector('.a-text-price .a-offscreen')?.textContent?.trim();
-                    const listPriceEl = (_listPriceRaw && _listPriceRaw.match(/\$[\d,]+/)) ? _listPriceRaw : null;
-                    const couponEl = document.querySelector('#couponBadge .a-color-success');
-                    const primeEl = document.querySelector('#primeFactsDesktop_feature_div [aria-label="Amazon Prime"], [aria-label="Amazon Prime"]');
-
-                    return {
-                        asin: document.querySelector('input[name="ASIN"]')?.value || null,
-                        title: title ? title.textContent.trim() : null,
-                        price: price,
-                        list_price: listPriceEl || null,
-                        discount_pct: discountEl ? discountEl.textContent.trim() : null,
-                        availability: availability,
-                        in_stock: !!addBtn,
-                        prime: !!primeEl,
-                        seller: seller,
-                        shipping: shipping,
-                        deal_badge: dealEl ? dealEl.textContent.trim() : null,
-                        coupon: couponEl ? couponEl.textContent.trim() : null,
-                        rating: ratingEl ? ratingEl.textContent.trim() : null,
-                        reviews: reviewsEl ? reviewsEl.textContent.trim() : null,
-                        url: window.location.href
-                    };
-                })()
-            """)
-
-            result = {"success": True}
-            result.update(data)
-            if screenshot:
-                result["screenshot"] = screenshot
-            return result
+    async def _check_price_on_page(self, page, product_id: str, screenshot: str = None) -> PriceResult:
+        """Load a product on an already-open tab and extract price data."""
+        await self._goto(page, f"https://www.amazon.com/dp/{product_id}")
+        data = await self.settle_and_eval(
+            self.js_call("check_price", page=page), wait_selector="#productTitle", page=page
+        )
 
-        finally:
-            await self.close()
+        if screenshot:
+            await self.save_screenshot(screenshot, page=page)
 
-    async def product_details(self, product_id: str, screenshot: str = None) -> dict:
+        result = PriceResult(success=True, **data)
+        if screenshot:
+            result["screenshot"] = screenshot
+        return result
+
+    async def product_details(self, product_id: str, screenshot: str = None) -> PriceResult:
         """Full product details including features, images, etc."""
         await self.ensure_browser()
         if not self.browser:
@@ -213,110 +520,22 @@ class AmazonShopper(ShopperBase):
 
         try:
             url = f"https://www.amazon.com/dp/{product_id}"
-            await self.navigate(url, wait=4)
+            data = await self._nav_and_eval(
+                url, self.js_call("product_details"), wait_selector="#productTitle"
+            )
 
             if screenshot:
-                await self.page.save_screenshot(screenshot)
-
-            data = await self.evaluate("""
-                (() => {
-                    const title = document.getElementById('productTitle');
-
-                    // Price: check each selector for actual price text (not just element existence)
-                    // because some .a-offscreen elements exist but have empty text
-                    let price = null;
-                    for (const sel of ['.priceToPay .a-offscreen',
-                                       '#corePrice_feature_div .a-offscreen',
-                                       '#apex_offerDisplay_desktop .a-offscreen',
-                                       '.a-price .a-offscreen']) {
-                        const el = document.querySelector(sel);
-                        const t = el?.textContent?.trim();
-                        if (t && t.match(/\\$[\\d,]+/)) { price = t; break; }
-                    }
-
-                    const availEl = document.getElementById('availability');
-                    let availability = null;
-                    if (availEl) {
-                        const lines = availEl.innerText.trim().split('\\n').filter(l => l.trim());
-                        availability = lines.join(' ').trim() || null;
-                    }
-
-                    const features = [];
-                    document.querySelectorAll('#feature-bullets li span.a-list-item').forEach(el => {
-                        const text = el.textContent.trim();
-                        if (text) features.push(text);
-                    });
-
-                    const brandEl = document.getElementById('bylineInfo');
-                    const brand = brandEl ? brandEl.textContent.trim() : null;
+                await self.save_screenshot(screenshot)
 
-                    const images = [];
-                    document.querySelectorAll('#altImages .a-button-thumbnail img').forEach(img => {
-                        const src = img.src?.replace(/\\._.*_\\./, '.');
-                        if (src) images.push(src);
-                    });
-
-                    const addBtn = document.getElementById('add-to-cart-button');
-                    const ratingEl = document.querySelector('#acrPopover .a-icon-alt');
-                    const reviewsEl = document.getElementById('acrCustomerReviewText');
-
-                    // Seller: cascade through possible containers
-                    const sellerEl = document.querySelector('#merchant-info') ||
-                                     document.querySelector('#sellerProfileTriggerId') ||
-                                     document.querySelector('#tabular-buybox .tabular-buybox-text[tabular-attribute-name="Sold by"] a') ||
-                                     document.querySelector('#buyBoxAccordion [tabular-attribute-name="Sold by"] a');
-                    let seller = sellerEl ? sellerEl.textContent.trim() : null;
-                    if (seller && seller.length < 2) seller = null;
-
-                    // Shipping: get full delivery text, not just bold portion
-                    const deliveryBlock = document.querySelector('#mir-layout-DELIVERY_BLOCK') ||
-                                          document.querySelector('#deliveryMessageMirId');
-                    let shipping = null;
-                    if (deliveryBlock) {
-                        const lines = deliveryBlock.innerText.trim().split('\\n').filter(l => l.trim());
-                        shipping = lines[0] || null;
-                    }
-
-                    const dealEl = document.querySelector('#dealBadge_feature_div .a-badge-text, .a-badge-label-inner');
-                    const discountEl = document.querySelector('.savingsPercentage');
-                    const _listPriceRaw = document.querySelector('.a-text-price .a-offscreen')?.textContent?.trim();
-                    const listPriceEl = (_listPriceRaw && _listPriceRaw.match(/\$[\d,]+/)) ? _listPriceRaw : null;
-                    const couponEl = document.querySelector('#couponBadge .a-color-success');
-                    const primeEl = document.querySelector('#primeFactsDesktop_feature_div [aria-label="Amazon Prime"], [aria-label="Amazon Prime"]');
-
-                    return {
-                        asin: document.querySelector('input[name="ASIN"]')?.value || null,
-                        title: title ? title.textContent.trim() : null,
-                        brand: brand,
-                        price: price,
-                        list_price: listPriceEl || null,
-                        discount_pct: discountEl ? discountEl.textContent.trim() : null,
-                        availability: availability,
-                        in_stock: !!addBtn,
-                        prime: !!primeEl,
-                        seller: seller,
-                        shipping: shipping,
-                        deal_badge: dealEl ? dealEl.textContent.trim() : null,
-                        coupon: couponEl ? couponEl.textContent.trim() : null,
-                        rating: ratingEl ? ratingEl.textContent.trim() : null,
-                        reviews: reviewsEl ? reviewsEl.textContent.trim() : null,
-                        features: features,
-                        image_count: images.length,
-                        url: window.location.href
-                    };
-                })()
-            """)
-
-            result = {"success": True}
-            result.update(data)
+            result = PriceResult(success=True, **data)
             if screenshot:
                 result["screenshot"] = screenshot
             return result
 
         finally:
-            await self.close()
+            self._schedule_close()
 
-    async def add_to_cart(self, product_id: str, screenshot: str = None) -> dict:
+    async def add_to_cart(self, product_id: str, screenshot: str = None) -> CartResult:
         """Add a product to cart by ASIN."""
         await self.ensure_browser()
         if not self.browser:
@@ -324,34 +543,30 @@ class AmazonShopper(ShopperBase):
 
         try:
             url = f"https://www.amazon.com/dp/{product_id}"
-            await self.navigate(url)
-
-            data = await self.evaluate("""
-                (() => {
-                    const title = document.getElementById('productTitle');
-                    const btn = document.getElementById('add-to-cart-button');
-                    if (!title) return { error: 'Product page not found' };
-                    if (!btn) return { error: 'Product not available for purchase' };
-                    btn.click();
-                    return {
-                        clicked: true,
-                        product: title.textContent.trim()
-                    };
-                })()
-            """)
+            data = await self._nav_and_eval(
+                url, self.js_call("add_to_cart"), wait_selector="#productTitle"
+            )
 
             if data.get("error"):
                 return {"success": False, "error": data["error"], "asin": product_id}
 
-            await self.page.sleep(4)
+            # Post-click settle + cart-count read in one evaluate. If the click
+            # navigated to the confirmation page, the pending evaluate dies with
+            # the old document, so read the count from the new one instead.
+            try:
+                cart_data = await self.evaluate(
+                    self.js_call("cart_count_after_click", data.get("cart_count_before", "0")),
+                    await_promise=True,
+                )
+            except Exception:
+                cart_data = await self.settle_and_eval(
+                    self.js_call("cart_count"), wait_selector="#nav-cart-count"
+                )
 
             if screenshot:
-                await self.page.save_screenshot(screenshot)
+                await self.save_screenshot(screenshot)
 
-            cart_data = await self.evaluate("""
-                document.getElementById('nav-cart-count')?.textContent?.trim() || '0'
-            """)
-            count_val = cart_data if isinstance(cart_data, str) else str(cart_data.get("value", "0"))
+            count_val = str(cart_data or "0")
 
             result = {
                 "success": True,
@@ -365,57 +580,30 @@ class AmazonShopper(ShopperBase):
             return result
 
         finally:
-            await self.close()
+            self._schedule_close()
 
-    async def view_cart(self, screenshot: str = None) -> dict:
+    async def view_cart(self, screenshot: str = None) -> CartResult:
         """View current cart contents."""
         await self.ensure_browser()
         if not self.browser:
             return {"success": False, "error": "Cookie extraction failed"}
 
         try:
-            await self.navigate("https://www.amazon.com/gp/cart/view.html")
+            data = await self._nav_and_eval(
+                "https://www.amazon.com/gp/cart/view.html",
+                self.js_call("view_cart"), wait_selector="#sc-active-cart",
+            )
 
             if screenshot:
-                await self.page.save_screenshot(screenshot)
-
-            data = await self.evaluate("""
-                (() => {
-                    const count = document.getElementById('nav-cart-count')?.textContent?.trim() || '0';
-                    const items = [];
-                    document.querySelectorAll('.sc-list-item:not(.sc-list-item-removed)').forEach(item => {
-                        const titleEl = item.querySelector('.sc-product-title, .a-truncate-full');
-                        const priceEl = item.querySelector('.sc-product-price, .sc-price');
-                        const qtyEl = item.querySelector('.sc-quantity-textfield');
-                        const asinEl = item.closest('[data-asin]');
-                        if (titleEl) {
-                            items.push({
-                                title: titleEl.textContent.trim(),
-                                price: priceEl ? priceEl.textContent.trim() : null,
-                                quantity: qtyEl ? qtyEl.value : '1',
-                                asin: asinEl ? asinEl.dataset.asin : null
-                            });
-                        }
-                    });
-                    const subtotalEl = document.getElementById('sc-subtotal-amount-activecart');
-                    const subtotal = subtotalEl ? subtotalEl.textContent.trim() : null;
-                    return {
-                        cart_count: count,
-                        items: items,
-                        subtotal: subtotal,
-                        url: window.location.href
-                    };
-                })()
-            """)
-
-            result = {"success": True}
-            result.update(data)
+                await self.save_screenshot(screenshot)
+
+            result = CartResult(success=True, **data)
             if screenshot:
                 result["screenshot"] = screenshot
             return result
 
         finally:
-            await self.close()
+            self._schedule_close()
 
     async def my_orders(self, limit: int = 10, screenshot: str = None) -> dict:
         """List recent Amazon orders."""
@@ -424,54 +612,18 @@ class AmazonShopper(ShopperBase):
             return {"success": False, "error": "Cookie extraction failed"}
 
         try:
-            await self.navigate("https://www.amazon.com/gp/your-account/order-history")
+            data = await self._nav_and_eval(
+                "https://www.amazon.com/gp/your-account/order-history",
+                self.js_call("my_orders", limit), wait_selector=".order-card, .js-order-card",
+            )
 
             if screenshot:
-                await self.page.save_screenshot(screenshot)
-
-            data = await self.evaluate(f"""
-                (() => {{
-                    const limit = {limit};
-                    const allText = document.body.innerText;
-
-                    const orderIdPattern = /\\d{{3}}-\\d{{7}}-\\d{{7}}/g;
-                    const orderIds = [...new Set(allText.match(orderIdPattern) || [])].slice(0, limit);
-
-                    const productLinks = document.querySelectorAll('a[href*="/dp/"], a[href*="/gp/product/"]');
-                    const products = [];
-                    const seen = new Set();
-                    for (const link of productLinks) {{
-                        const text = link.textContent.trim();
-                        if (text && text.length > 5 && text.length < 200 && !seen.has(text)) {{
-                            seen.add(text);
-                            const asinMatch = link.href.match(/\\/dp\\/([A-Z0-9]{{10}})/);
-                            products.push({{
-                                name: text,
-                                asin: asinMatch ? asinMatch[1] : null,
-                                url: link.href
-                            }});
-                        }}
-                        if (products.length >= limit) break;
-                    }}
-
-                    const datePattern = /(?:January|February|March|April|May|June|July|August|September|October|November|December)\\s+\\d{{1,2}},\\s+\\d{{4}}/g;
-                    const dates = [...new Set(allText.match(datePattern) || [])].slice(0, limit);
-
-                    return {{
-                        order_count: orderIds.length,
-                        order_ids: orderIds,
-                        products: products,
-                        dates: dates,
-                        url: window.location.href
-                    }};
-                }})()
-            """)
-
-            result = {"success": True}
-            result.update(data)
+                await self.save_screenshot(screenshot)
+
+            result = {"success": True, **data}
             if screenshot:
                 result["screenshot"] = screenshot
             return result
 
         finally:
-            await self.close()
+            self._schedule_close()
@@ -5,247 +5,548 @@ Full implementation: search, check-price, product details,
 add-to-cart, cart, and order history.
 """
 
+import asyncio
+import functools
+import time
 import urllib.parse
-from pathlib import Path
 
-from base import ShopperBase
+from base import CartResult, PriceResult, SearchResult, ShopperBase
+
+# Search terms repeat a lot in polling loops; memoize their encoding.
+_quote_plus = functools.lru_cache(maxsize=1024)(urllib.parse.quote_plus)
+
+# Page extractors: constant JS function sources, registered on
+# NeweggShopper.EXTRACTORS and installed once per tab. Call-time inputs
+# (limit) are passed as JSON arguments via ShopperBase.js_call().
+
+_SEARCH_JS = """
+    (limit) => {
+        const results = [];
+
+        // One combined querySelectorAll per card instead of ~9
+        // querySelector walks. Each bucket keeps the first element
+        // (document order) matching its selector — the same element
+        // card.querySelector(selector) would have returned.
+        const buckets = [
+            ['title', '.item-title'],
+            ['price', '.price-current'],
+            ['dollars', '.price-current strong'],
+            ['cents', '.price-current sup'],
+            ['rating', '.item-rating i'],
+            ['reviews', '.item-rating-num'],
+            ['shipping', '.price-ship'],
+            ['deal', '.item-flag, .item-promo'],
+            ['listPrice', '.price-was-data'],
+        ];
+        const combined = buckets.map(b => b[1]).join(', ');
+        const ITEM_RX = /\\/p\\/([\\w-]+)/;
+
+        const cards = document.querySelectorAll('.item-cell, .item-container');
+        for (const card of cards) {
+            if (results.length >= limit) break;
+
+            const hit = {};
+            for (const el of card.querySelectorAll(combined)) {
+                for (const [key, sel] of buckets) {
+                    if (!hit[key] && el.matches(sel)) hit[key] = el;
+                }
+            }
+
+            const titleEl = hit.title;
+            const title = titleEl ? titleEl.textContent.trim() : null;
+            if (!title) continue;
+
+            const href = titleEl?.href || titleEl?.closest('a')?.href || null;
+
+            // Extract item number from URL (includes dashes like 3D5-006G-00047)
+            let itemNumber = null;
+            if (href) {
+                const match = href.match(ITEM_RX);
+                itemNumber = match ? match[1] : null;
+            }
+
+            // Dollars/cents only count inside the first .price-current,
+            // as priceEl.querySelector() would have found them.
+            const priceEl = hit.price;
+            let price = null;
+            if (priceEl) {
+                const dollars = priceEl.contains(hit.dollars) ? hit.dollars : null;
+                const cents = priceEl.contains(hit.cents) ? hit.cents : null;
+                if (dollars) {
+                    price = '$' + dollars.textContent.trim() +
+                            (cents ? cents.textContent.trim() : '');
+                }
+            }
+
+            const ratingEl = hit.rating;
+            const rating = ratingEl ? ratingEl.getAttribute('aria-label') : null;
+
+            const reviewsEl = hit.reviews;
+            const reviews = reviewsEl ? reviewsEl.textContent.trim() : null;
+
+            const shippingEl = hit.shipping;
+            const shipping = shippingEl ? shippingEl.textContent.trim() : null;
+
+            const dealEl = hit.deal;
+            const deal_badge = dealEl ? dealEl.textContent.trim() : null;
+
+            const listPriceEl = hit.listPrice;
+            let list_price = listPriceEl ? listPriceEl.textContent.trim() : null;
+            if (list_price && !list_price.startsWith('$')) list_price = '$' + list_price;
+
+            results.push({
+                item_number: itemNumber,
+                title: title,
+                price: price,
+                list_price: list_price,
+                rating: rating,
+                reviews: reviews,
+                shipping: shipping,
+                deal_badge: deal_badge,
+                url: href
+            });
+        }
+
+        return {
+            result_count: results.length,
+            results: results
+        };
+    }
+"""
+
+_CHECK_PRICE_JS = """
+    () => {
+        const titleEl = document.querySelector('.product-title');
+        const title = titleEl ? titleEl.textContent.trim() : null;
+
+        const priceEl = document.querySelector('.price-current');
+        let price = null;
+        if (priceEl) {
+            const dollars = priceEl.querySelector('strong');
+            const cents = priceEl.querySelector('sup');
+            if (dollars) {
+                price = '$' + dollars.textContent.trim() +
+                        (cents ? cents.textContent.trim() : '');
+            }
+        }
+
+        const listPriceEl = document.querySelector('.price-was-data');
+        let list_price = listPriceEl ? listPriceEl.textContent.trim() : null;
+        if (list_price && !list_price.startsWith('$')) list_price = '$' + list_price;
+
+        const discountEl = document.querySelector('.price-save-percent');
+        const discount_pct = discountEl ? discountEl.textContent.trim() : null;
+
+        const addBtn = document.querySelector('.btn-primary[title*="Add to cart"], .btn-primary.btn-wide');
+        const in_stock = !!addBtn;
+
+        const availEl = document.querySelector('.product-inventory strong');
+        const availability = availEl ? availEl.textContent.trim() : null;
+
+        const ratingEl = document.querySelector('.product-rating .rating');
+        const rating = ratingEl ? ratingEl.getAttribute('aria-label') : null;
+
+        const reviewsEl = document.querySelector('.product-review .btn');
+        const reviews = reviewsEl ? reviewsEl.textContent.trim() : null;
+
+        const sellerEl = document.querySelector('.product-seller strong');
+        const seller = sellerEl ? sellerEl.textContent.trim() : null;
+
+        const shippingEl = document.querySelector('.product-shipping .product-shipped-by');
+        const shipping = shippingEl ? shippingEl.textContent.trim() : null;
+
+        return {
+            item_number: window.location.pathname.split('/').pop() || null,
+            title: title,
+            price: price,
+            list_price: list_price,
+            discount_pct: discount_pct,
+            availability: availability,
+            in_stock: in_stock,
+            seller: seller,
+            shipping: shipping,
+            deal_badge: null,
+            coupon: null,
+            rating: rating,
+            reviews: reviews,
+            url: window.location.href
+        };
+    }
+"""
+
+_ADD_TO_CART_JS = """
+    () => {
+        const titleEl = document.querySelector('.product-title');
+        const title = titleEl ? titleEl.textContent.trim() : null;
+
+        // Try multiple button selectors — Newegg changes these
+        const btn = document.querySelector('.product-buy .btn-primary') ||
+                    document.querySelector('.product-buy button') ||
+                    document.querySelector('.btn-primary[title*="Add to cart"]') ||
+                    document.querySelector('.btn-primary.btn-wide');
+        if (!title) return { error: 'Product page not found' };
+        if (!btn) return { error: 'Product not available for purchase' };
+
+        // Check for out of stock text
+        const buyArea = document.querySelector('.product-buy');
+        if (buyArea && buyArea.textContent.toLowerCase().includes('out of stock')) {
+            return { error: 'Product is out of stock' };
+        }
+
+        const qty = document.querySelector('.header-cart .cart-qty') ||
+                    document.querySelector('.nav-cart-number') ||
+                    document.querySelector('#cart-qty');
+        const countBefore = qty ? qty.textContent.trim() : '0';
+
+        btn.click();
+        return { clicked: true, product: title, cart_count_before: countBefore };
+    }
+"""
+
+_CART_COUNT_JS = """
+    () => {
+        const el = document.querySelector('.header-cart .cart-qty') ||
+                   document.querySelector('.nav-cart-number') ||
+                   document.querySelector('#cart-qty');
+        return el ? el.textContent.trim() : '0';
+    }
+"""
+
+_VIEW_CART_JS = """
+    () => {
+        const items = [];
+        const seen = new Set();
+
+        // Highest-priority match for a selector cascade under `root`, from a
+        // single combined querySelectorAll (replaces chained `||` lookups).
+        const pick = (root, sels) => {
+            let best = null, bestRank = sels.length;
+            for (const el of root.querySelectorAll(sels.join(', '))) {
+                const rank = sels.findIndex(s => el.matches(s));
+                if (rank < bestRank) {
+                    best = el;
+                    bestRank = rank;
+                    if (rank === 0) break;
+                }
+            }
+            return best;
+        };
+        const TITLE_SELS = ['a.item-title', '.item-title', 'a[title]'];
+        const PRICE_SELS = ['.price-current', '[class*="price"]'];
+        const QTY_SELS = ['select[name*="qty"], input[name*="qty"]',
+                          '.item-qty select, .item-qty input'];
+        const ITEM_RX = /\\/p\\/([\\w-]+)/;
+        const PRICE_RX = /\\$[\\d,.]+/;
+
+        // Cart item rows — try multiple container selectors
+        const rows = document.querySelectorAll(
+            '.item-container, .items-row, [class*="item-cell"]'
+        );
+
+        for (const row of rows) {
+            const titleEl = pick(row, TITLE_SELS);
+            if (!titleEl) continue;
+
+            const title = titleEl.textContent.trim();
+            if (!title || title.length < 3) continue;
+
+            const href = titleEl.href || titleEl.closest('a')?.href || null;
+            let itemNumber = null;
+            if (href) {
+                const match = href.match(ITEM_RX);
+                itemNumber = match ? match[1] : null;
+            }
+
+            // Deduplicate — cart page has recommendation/warranty sections
+            // that repeat the same product links
+            const key = itemNumber || title;
+            if (seen.has(key)) continue;
+            seen.add(key);
+
+            const priceEl = pick(row, PRICE_SELS);
+            let price = null;
+            if (priceEl) {
+                const dollars = priceEl.querySelector('strong');
+                const cents = priceEl.querySelector('sup');
+                if (dollars) {
+                    price = '$' + dollars.textContent.trim() +
+                            (cents ? cents.textContent.trim() : '');
+                } else {
+                    const text = priceEl.textContent.trim();
+                    if (text.includes('$')) price = text;
+                }
+            }
+
+            const qtyEl = pick(row, QTY_SELS);
+            const quantity = qtyEl ? (qtyEl.value || '1') : '1';
+
+            items.push({
+                title: title,
+                price: price,
+                quantity: quantity,
+                item_number: itemNumber
+            });
+        }
+
+        // Cart count from the header badge (same cascade as _CART_COUNT_JS);
+        // reading body.innerText for "Shopping Cart (N Item)" forced a layout.
+        const badge = pick(document, ['.header-cart .cart-qty', '.nav-cart-number', '#cart-qty']);
+        const badgeText = badge ? badge.textContent.trim() : '';
+        const pageCount = badgeText || String(items.length);
+
+        // Total/subtotal
+        const totalEl = document.querySelector('.summary-content-total strong') ||
+                        document.querySelector('.summary-content-total') ||
+                        document.querySelector('.summary-content .item-total');
+        let subtotal = null;
+        if (totalEl) {
+            const text = totalEl.textContent.trim();
+            const match = text.match(PRICE_RX);
+            subtotal = match ? match[0] : text;
+        }
+
+        return {
+            cart_count: pageCount,
+            items: items,
+            subtotal: subtotal,
+            url: window.location.href
+        };
+    }
+"""
+
+_ORDER_HISTORY_LINK_JS = """
+    () => {
+        // Look for order-related links in account dropdown or page
+        const links = document.querySelectorAll('a[href*="order"], a[href*="Order"]');
+        for (const link of links) {
+            const href = link.href || '';
+            const text = (link.textContent || '').toLowerCase();
+            if (text.includes('order') && href.includes('newegg')) {
+                return href;
+            }
+        }
+        return null;
+    }
+"""
+
+_MY_ORDERS_JS = """
+    (limit) => {
+        // Account pages bounce to sign-in when the session is stale; report
+        // that here rather than in a separate round-trip.
+        const url = window.location.href;
+        if (/signin|identity/.test(url)) return { auth_required: true, url: url };
+
+        // Scan only the order-info / order-number nodes, joined one per line,
+        // instead of serializing the whole page. The full-page innerText is a
+        // fallback for when none of those nodes exist.
+        const orderNodes = document.querySelectorAll(
+            '.order-info, .order-number, [class*="OrderNumber"], [class*="order-number"]'
+        );
+        let pageText = null;
+        const fullText = () => pageText ??= document.body.innerText;
+        const orderText = orderNodes.length
+            ? Array.from(orderNodes, n => n.textContent).join('\\n')
+            : fullText();
+
+        // Newegg order numbers are typically numeric
+        const ORDER_RX = /\\b\\d{9,15}\\b/g;
+        const candidates = orderText.match(ORDER_RX) || [];
+        const orderIds = [...new Set(candidates)].slice(0, limit);
+
+        // Product links
+        const productLinks = document.querySelectorAll(
+            'a[href*="/p/"], a[href*="/Product/"]'
+        );
+        const ITEM_RX = /\\/p\\/([\\w-]+)/;
+        const products = [];
+        const seen = new Set();
+        for (const link of productLinks) {
+            const text = link.textContent.trim();
+            if (text && text.length > 5 && text.length < 200 && !seen.has(text)) {
+                seen.add(text);
+                const itemMatch = link.href.match(ITEM_RX);
+                products.push({
+                    name: text,
+                    item_number: itemMatch ? itemMatch[1] : null,
+                    url: link.href
+                });
+            }
+            if (products.length >= limit) break;
+        }
+
+        // Dates — Newegg uses MM/DD/YYYY format
+        const DATE_RX = /\\b\\d{1,2}\\/\\d{1,2}\\/\\d{4}\\b/g;
+        let dateMatches = orderText.match(DATE_RX);
+        if (!dateMatches && orderNodes.length) dateMatches = fullText().match(DATE_RX);
+        const dates = [...new Set(dateMatches || [])].slice(0, limit);
+
+        return {
+            order_count: orderIds.length,
+            order_ids: orderIds,
+            products: products,
+            dates: dates,
+            url: url
+        };
+    }
+"""
 
 
 class NeweggShopper(ShopperBase):
     DOMAIN = "newegg.com"
     DISPLAY_NAME = "Newegg"
-
-    async def search(self, query: str, limit: int = 5, screenshot: str = None) -> dict:
+    PRODUCT_ID_KEY = "item_number"
+
+    EXTRACTORS = {
+        "search": _SEARCH_JS,
+        "check_price": _CHECK_PRICE_JS,
+        "add_to_cart": _ADD_TO_CART_JS,
+        "cart_count": _CART_COUNT_JS,
+        "view_cart": _VIEW_CART_JS,
+        "order_history_link": _ORDER_HISTORY_LINK_JS,
+        "my_orders": _MY_ORDERS_JS,
+    }
+
+    # URL bases derived from DOMAIN once per instance, so a subclass only
+    # has to override DOMAIN. Call sites append the encoded query / id.
+    @functools.cached_property
+    def _home_url(self) -> str:
+        return f"https://www.{self.DOMAIN}"
+
+    @functools.cached_property
+    def _search_url_base(self) -> str:
+        return f"{self._home_url}/p/pl?d="
+
+    @functools.cached_property
+    def _product_url_base(self) -> str:
+        return f"{self._home_url}/p/"
+
+    @functools.cached_property
+    def _cart_url(self) -> str:
+        return f"https://secure.{self.DOMAIN}/shop/cart"
+
+    @functools.cached_property
+    def _orders_url(self) -> str:
+        return f"https://secure.{self.DOMAIN}/orders/list"
+
+    # check_price results are kept for PRICE_TTL seconds so repeated lookups
+    # of the same SKU on this adapter (and product_details, which delegates
+    # here) skip the browser; the per-key lock collapses concurrent misses
+    # into a single fetch.
+    PRICE_TTL = 30.0
+
+    def __init__(self):
+        super().__init__()
+        self._price_cache = {}  # product_id → (monotonic time, result)
+        self._price_locks = {}  # product_id → lock held by the fetch in flight
+
+    async def search(self, query: str, limit: int = 5, screenshot: str = None) -> SearchResult:
         """Search Newegg products."""
         await self.ensure_browser()
         if not self.browser:
             return {"success": False, "error": "Cookie extraction failed"}
 
         try:
-            encoded = urllib.parse.quote_plus(query)
-            url = f"https://www.newegg.com/p/pl?d={encoded}"
-            await self.navigate(url, wait=4)
+            url = self._search_url_base + _quote_plus(query)
+            await self.navigate_until(url, ".item-cell, .item-container")
 
-            if screenshot:
-                await self.page.save_screenshot(screenshot)
-
-            safe_query = query.replace("'", "\\'")
-            data = await self.evaluate(f"""
-                (() => {{
-                    const limit = {limit};
-                    const results = [];
-                    const cards = document.querySelectorAll('.item-cell, .item-container');
-                    for (const card of cards) {{
-                        if (results.length >= limit) break;
-
-                        const titleEl = card.querySelector('.item-title');
-                        const title = titleEl ? titleEl.textContent.trim() : null;
-                        if (!title) continue;
-
-                        const href = titleEl?.href || titleEl?.closest('a')?.href || null;
-
-                        // Extract item number from URL (includes dashes like 3D5-006G-00047)
-                        let itemNumber = null;
-                        if (href) {{
-                            const match = href.match(/\\/p\\/([\\w-]+)/);
-                            itemNumber = match ? match[1] : null;
-                        }}
-
-                        const priceEl = card.querySelector('.price-current');
-                        let price = null;
-                        if (priceEl) {{
-                            const dollars = priceEl.querySelector('strong');
-                            const cents = priceEl.querySelector('sup');
-                            if (dollars) {{
-                                price = '$' + dollars.textContent.trim() +
-                                        (cents ? cents.textContent.trim() : '');
-                            }}
-                        }}
-
-                        const ratingEl = card.querySelector('.item-rating i');
-                        const rating = ratingEl ? ratingEl.getAttribute('aria-label') : null;
-
-                        const reviewsEl = card.querySelector('.item-rating-num');
-                        const reviews = reviewsEl ? reviewsEl.textContent.trim() : null;
-
-                        const shippingEl = card.querySelector('.price-ship');
-                        const shipping = shippingEl ? shippingEl.textContent.trim() : null;
-
-                        const dealEl = card.querySelector('.item-flag, .item-promo');
-                        const deal_badge = dealEl ? dealEl.textContent.trim() : null;
-
-                        const listPriceEl = card.querySelector('.price-was-data');
-                        let list_price = listPriceEl ? listPriceEl.textContent.trim() : null;
-                        if (list_price && !list_price.startsWith('$')) list_price = '$' + list_price;
-
-                        results.push({{
-                            item_number: itemNumber,
-                            title: title,
-                            price: price,
-                            list_price: list_price,
-                            rating: rating,
-                            reviews: reviews,
-                            shipping: shipping,
-                            deal_badge: deal_badge,
-                            url: href
-                        }});
-                    }}
-
-                    return {{
-                        query: '{safe_query}',
-                        result_count: results.length,
-                        results: results
-                    }};
-                }})()
-            """)
-
-            result = {"success": True}
-            result.update(data)
+            data = await self.evaluate_with_screenshot(
+                self.js_call("search", limit), screenshot
+            )
+
+            result = SearchResult(success=True, query=query, **data)
             if screenshot:
                 result["screenshot"] = screenshot
             return result
 
         finally:
-            await self.close()
+            self._schedule_close()
 
-    async def check_price(self, product_id: str, screenshot: str = None) -> dict:
+    async def check_price(self, product_id: str, screenshot: str = None) -> PriceResult:
         """Get price/availability for a Newegg product."""
+        if screenshot:
+            return await self._fetch_price(product_id, screenshot)
+
+        cached = self._cached_price(product_id)
+        if cached is not None:
+            return cached
+        lock = self._price_locks.get(product_id)
+        created = lock is None
+        if created:
+            lock = self._price_locks[product_id] = asyncio.Lock()
+        try:
+            async with lock:
+                cached = self._cached_price(product_id)
+                if cached is not None:
+                    return cached
+                result = await self._fetch_price(product_id)
+                if result.get("success"):
+                    self._price_cache[product_id] = (time.monotonic(), result)
+                return dict(result)
+        finally:
+            # Waiters already hold the lock object; later callers hit the cache.
+            if created:
+                del self._price_locks[product_id]
+
+    def _cached_price(self, product_id: str):
+        entry = self._price_cache.get(product_id)
+        if entry and time.monotonic() - entry[0] < self.PRICE_TTL:
+            return dict(entry[1])
+        return None
+
+    async def _fetch_price(self, product_id: str, screenshot: str = None) -> PriceResult:
         await self.ensure_browser()
         if not self.browser:
             return {"success": False, "error": "Cookie extraction failed"}
 
         try:
-            url = f"https://www.newegg.com/p/{product_id}"
-            await self.navigate(url)
-
-            if screenshot:
-                await self.page.save_screenshot(screenshot)
-
-            data = await self.evaluate("""
-                (() => {
-                    const titleEl = document.querySelector('.product-title');
-                    const title = titleEl ? titleEl.textContent.trim() : null;
-
-                    const priceEl = document.querySelector('.price-current');
-                    let price = null;
-                    if (priceEl) {
-                        const dollars = priceEl.querySelector('strong');
-                        const cents = priceEl.querySelector('sup');
-                        if (dollars) {
-                            price = '$' + dollars.textContent.trim() +
-                                    (cents ? cents.textContent.trim() : '');
-                        }
-                    }
-
-                    const listPriceEl = document.querySelector('.price-was-data');
-                    let list_price = listPriceEl ? listPriceEl.textContent.trim() : null;
-                    if (list_price && !list_price.startsWith('$')) list_price = '$' + list_price;
-
-                    const discountEl = document.querySelector('.price-save-percent');
-                    const discount_pct = discountEl ? discountEl.textContent.trim() : null;
-
-                    const addBtn = document.querySelector('.btn-primary[title*="Add to cart"], .btn-primary.btn-wide');
-                    const in_stock = !!addBtn;
-
-                    const availEl = document.querySelector('.product-inventory strong');
-                    const availability = availEl ? availEl.textContent.trim() : null;
-
-                    const ratingEl = document.querySelector('.product-rating .rating');
-                    const rating = ratingEl ? ratingEl.getAttribute('aria-label') : null;
-
-                    const reviewsEl = document.querySelector('.product-review .btn');
-                    const reviews = reviewsEl ? reviewsEl.textContent.trim() : null;
-
-                    const sellerEl = document.querySelector('.product-seller strong');
-                    const seller = sellerEl ? sellerEl.textContent.trim() : null;
-
-                    const shippingEl = document.querySelector('.product-shipping .product-shipped-by');
-                    const shipping = shippingEl ? shippingEl.textContent.trim() : null;
-
-                    return {
-                        item_number: window.location.pathname.split('/').pop() || null,
-                        title: title,
-                        price: price,
-                        list_price: list_price,
-                        discount_pct: discount_pct,
-                        availability: availability,
-                        in_stock: in_stock,
-                        seller: seller,
-                        shipping: shipping,
-                        deal_badge: null,
-                        coupon: null,
-                        rating: rating,
-                        reviews: reviews,
-                        url: window.location.href
-                    };
-                })()
-            """)
-
-            result = {"success": True}
-            result.update(data)
-            if screenshot:
-                result["screenshot"] = screenshot
-            return result
-
+            return await self._check_price_on_page(self.page, product_id, screenshot)
         finally:
-            await self.close()
-
-    async def product_details(self, product_id: str, screenshot: str = None) -> dict:
+            self._schedule_close()
+
+    async def _check_price_on_page(self, page, product_id: str, screenshot: str = None) -> PriceResult:
+        """Load a product on an already-open tab and extract price data."""
+        url = self._product_url_base + product_id
+        data = await self._navigate_and_extract(
+            page, url, self.js_call("check_price", page=page),
+            wait_selector=".product-buy", screenshot=screenshot
+        )
+
+        result = PriceResult(success=True, **data)
+        if screenshot:
+            result["screenshot"] = screenshot
+        return result
+
+    async def product_details(self, product_id: str, screenshot: str = None) -> PriceResult:
         """Full product details — delegates to check_price for Newegg."""
         return await self.check_price(product_id, screenshot)
 
-    async def add_to_cart(self, product_id: str, screenshot: str = None) -> dict:
+    async def add_to_cart(self, product_id: str, screenshot: str = None) -> CartResult:
         """Add a product to cart by item number."""
         await self.ensure_browser()
         if not self.browser:
             return {"success": False, "error": "Cookie extraction failed"}
 
         try:
-            url = f"https://www.newegg.com/p/{product_id}"
-            await self.navigate(url, wait=4)
-
-            data = await self.evaluate("""
-                (() => {
-                    const titleEl = document.querySelector('.product-title');
-                    const title = titleEl ? titleEl.textContent.trim() : null;
-
-                    // Try multiple button selectors — Newegg changes these
-                    const btn = document.querySelector('.product-buy .btn-primary') ||
-                                document.querySelector('.product-buy button') ||
-                                document.querySelector('.btn-primary[title*="Add to cart"]') ||
-                                document.querySelector('.btn-primary.btn-wide');
-                    if (!title) return { error: 'Product page not found' };
-                    if (!btn) return { error: 'Product not available for purchase' };
-
-                    // Check for out of stock text
-                    const buyArea = document.querySelector('.product-buy');
-                    if (buyArea && buyArea.textContent.toLowerCase().includes('out of stock')) {
-                        return { error: 'Product is out of stock' };
-                    }
-
-                    btn.click();
-                    return { clicked: true, product: title };
-                })()
-            """)
+            url = self._product_url_base + product_id
+            await self.navigate_until(url, ".product-buy")
+
+            data = await self.evaluate(self.js_call("add_to_cart"))
 
             if data.get("error"):
                 return {"success": False, "error": data["error"], "item_number": product_id}
 
-            await self.page.sleep(4)
-
+            # Poll the header badge while the screenshot is written instead
+            # of sleeping a fixed 4s before reading it.
+            cart_task = asyncio.create_task(
+                self._poll_cart_count(data.get("cart_count_before", "0"))
+            )
             if screenshot:
-                await self.page.save_screenshot(screenshot)
-
-            # Get cart count from header
-            cart_data = await self.evaluate("""
-                (() => {
-                    const el = document.querySelector('.header-cart .cart-qty') ||
-                               document.querySelector('.nav-cart-number') ||
-                               document.querySelector('#cart-qty');
-                    return el ? el.textContent.trim() : '0';
-                })()
-            """)
-            count_val = cart_data if isinstance(cart_data, str) else str(cart_data.get("value", "0"))
+                _, cart_data = await asyncio.gather(
+                    self.save_screenshot(screenshot), cart_task
+                )
+            else:
+                cart_data = await cart_task
+            count_val = str(cart_data or "0")
 
             result = {
                 "success": True,
@@ -259,112 +560,46 @@ class NeweggShopper(ShopperBase):
             return result
 
         finally:
-            await self.close()
+            self._schedule_close()
+
+    async def _poll_cart_count(self, before: str, timeout: float = 4.0,
+                               interval: float = 0.2):
+        """Read the cart badge until it differs from `before` or `timeout` elapses."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        count = before
+        while loop.time() < deadline:
+            try:
+                count = await self.evaluate(self.js_call("cart_count"))
+            except Exception:
+                # The page may be mid-navigation after the click; retry.
+                pass
+            else:
+                if count != before:
+                    return count
+            await asyncio.sleep(interval)
+        return count
 
-    async def view_cart(self, screenshot: str = None) -> dict:
+    async def view_cart(self, screenshot: str = None) -> CartResult:
         """View current cart contents."""
         await self.ensure_browser()
         if not self.browser:
             return {"success": False, "error": "Cookie extraction failed"}
 
         try:
-            await self.navigate("https://secure.newegg.com/shop/cart", wait=4)
+            await self.navigate_until(self._cart_url, ".summary-content-total, .summary-content")
 
-            if screenshot:
-                await self.page.save_screenshot(screenshot)
-
-            data = await self.evaluate("""
-                (() => {
-                    const items = [];
-                    const seen = new Set();
-
-                    // Cart item rows — try multiple container selectors
-                    const rows = document.querySelectorAll(
-                        '.item-container, .items-row, [class*="item-cell"]'
-                    );
-
-                    for (const row of rows) {
-                        const titleEl = row.querySelector('a.item-title') ||
-                                        row.querySelector('.item-title') ||
-                                        row.querySelector('a[title]');
-                        if (!titleEl) continue;
-
-                        const title = titleEl.textContent.trim();
-                        if (!title || title.length < 3) continue;
-
-                        const href = titleEl.href || titleEl.closest('a')?.href || null;
-                        let itemNumber = null;
-                        if (href) {
-                            const match = href.match(/\\/p\\/([\\w-]+)/);
-                            itemNumber = match ? match[1] : null;
-                        }
-
-                        // Deduplicate — cart page has recommendation/warranty sections
-                        // that repeat the same product links
-                        const key = itemNumber || title;
-                        if (seen.has(key)) continue;
-                        seen.add(key);
-
-                        const priceEl = row.querySelector('.price-current') ||
-                                        row.querySelector('[class*="price"]');
-                        let price = null;
-                        if (priceEl) {
-                            const dollars = priceEl.querySelector('strong');
-                            const cents = priceEl.querySelector('sup');
-                            if (dollars) {
-                                price = '$' + dollars.textContent.trim() +
-                                        (cents ? cents.textContent.trim() : '');
-                            } else {
-                                const text = priceEl.textContent.trim();
-                                if (text.includes('$')) price = text;
-                            }
-                        }
-
-                        const qtyEl = row.querySelector('select[name*="qty"], input[name*="qty"]') ||
-                                      row.querySelector('.item-qty select, .item-qty input');
-                        const quantity = qtyEl ? (qtyEl.value || '1') : '1';
-
-                        items.push({
-                            title: title,
-                            price: price,
-                            quantity: quantity,
-                            item_number: itemNumber
-                        });
-                    }
-
-                    // Cart count from page header text e.g. "Shopping Cart (1 Item)"
-                    const headerText = document.body.innerText;
-                    const countMatch = headerText.match(/Shopping Cart\\s*\\((\\d+)\\s*Item/i);
-                    const pageCount = countMatch ? countMatch[1] : String(items.length);
-
-                    // Total/subtotal
-                    const totalEl = document.querySelector('.summary-content-total strong') ||
-                                    document.querySelector('.summary-content-total') ||
-                                    document.querySelector('.summary-content .item-total');
-                    let subtotal = null;
-                    if (totalEl) {
-                        const text = totalEl.textContent.trim();
-                        const match = text.match(/\\$[\\d,.]+/);
-                        subtotal = match ? match[0] : text;
-                    }
-
-                    return {
-                        cart_count: pageCount,
-                        items: items,
-                        subtotal: subtotal,
-                        url: window.location.href
-                    };
-                })()
-            """)
-
-            result = {"success": True}
-            result.update(data)
+            data = await self.evaluate_with_screenshot(
+                self.js_call("view_cart"), screenshot
+            )
+
+            result = CartResult(success=True, **data)
             if screenshot:
                 result["screenshot"] = screenshot
             return result
 
         finally:
-            await self.close()
+            self._schedule_close()
 
     async def my_orders(self, limit: int = 10, screenshot: str = None) -> dict:
         """List recent Newegg orders."""
@@ -374,92 +609,29 @@ class NeweggShopper(ShopperBase):
 
         try:
             # Navigate to Newegg homepage, then find order history link
-            await self.navigate("https://www.newegg.com", wait=3)
+            await self.navigate_until(self._home_url, timeout=3)
             # Extract the actual order history URL from the account menu
-            order_url = await self.evaluate("""
-                (() => {
-                    // Look for order-related links in account dropdown or page
-                    const links = document.querySelectorAll('a[href*="order"], a[href*="Order"]');
-                    for (const link of links) {
-                        const href = link.href || '';
-                        const text = (link.textContent || '').toLowerCase();
-                        if (text.includes('order') && href.includes('newegg')) {
-                            return href;
-                        }
-                    }
-                    return null;
-                })()
-            """)
-            target = order_url if isinstance(order_url, str) and order_url.startswith('http') \
-                else "https://secure.newegg.com/orders/list"
-            await self.navigate(target, wait=5)
+            order_url = await self.evaluate(self.js_call("order_history_link"))
+            target = order_url if order_url and order_url.startswith('http') else self._orders_url
+            await self.navigate_until(target, '.order-info, [class*="order-number"]')
 
-            if screenshot:
-                await self.page.save_screenshot(screenshot)
+            data = await self.evaluate_with_screenshot(
+                self.js_call("my_orders", limit), screenshot
+            )
 
             # Detect auth redirect — Newegg account pages require fresh login
-            landed_url = await self.evaluate("window.location.href")
-            if isinstance(landed_url, dict):
-                url_str = landed_url.get("value", str(landed_url))
-            else:
-                url_str = str(landed_url)
-            if "signin" in url_str or "identity" in url_str:
+            if data.get("auth_required"):
                 return {
                     "success": False,
                     "error": "Newegg requires re-authentication for order history. "
                              "Log into secure.newegg.com in Chrome, then retry.",
-                    "url": url_str
+                    "url": data.get("url")
                 }
 
-            data = await self.evaluate(f"""
-                (() => {{
-                    const limit = {limit};
-                    const allText = document.body.innerText;
-
-                    // Newegg order numbers are typically numeric
-                    const orderIdPattern = /\\b\\d{{9,15}}\\b/g;
-                    const candidates = allText.match(orderIdPattern) || [];
-                    const orderIds = [...new Set(candidates)].slice(0, limit);
-
-                    // Product links
-                    const productLinks = document.querySelectorAll(
-                        'a[href*="/p/"], a[href*="/Product/"]'
-                    );
-                    const products = [];
-                    const seen = new Set();
-                    for (const link of productLinks) {{
-                        const text = link.textContent.trim();
-                        if (text && text.length > 5 && text.length < 200 && !seen.has(text)) {{
-                            seen.add(text);
-                            const itemMatch = link.href.match(/\\/p\\/([\\w-]+)/);
-                            products.push({{
-                                name: text,
-                                item_number: itemMatch ? itemMatch[1] : null,
-                                url: link.href
-                            }});
-                        }}
-                        if (products.length >= limit) break;
-                    }}
-
-                    // Dates — Newegg uses MM/DD/YYYY format
-                    const datePattern = /\\b\\d{{1,2}}\\/\\d{{1,2}}\\/\\d{{4}}\\b/g;
-                    const dates = [...new Set(allText.match(datePattern) || [])].slice(0, limit);
-
-                    return {{
-                        order_count: orderIds.length,
-                        order_ids: orderIds,
-                        products: products,
-                        dates: dates,
-                        url: window.location.href
-                    }};
-                }})()
-            """)
-
-            result = {"success": True}
-            result.update(data)
+            result = {"success": True, **data}
             if screenshot:
                 result["screenshot"] = screenshot
             return result
 
         finally:
-            await self.close()
+            self._schedule_close()
@@ -5,115 +5,376 @@ Provides shared browser management, cookie injection, JS evaluation,
 and optional session pool integration.
 """
 
+import asyncio
+import base64
+import hashlib
+import json
+import socket
 import sys
+import time
 from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import TypedDict
 
-# Add stealth-browser scripts to path for shared infrastructure
+# Add stealth-browser scripts to path for shared infrastructure. nodriver,
+# config and chrome_cookies are imported where they are used, so importing an
+# adapter (e.g. to list its extractors) doesn't pull in the browser stack.
 STEALTH_SCRIPTS = Path.home() / ".claude" / "skills" / "stealth-browser" / "scripts"
 sys.path.insert(0, str(STEALTH_SCRIPTS))
 
-from config import BROWSER_ARGS  # noqa: E402
-from chrome_cookies import extract_cookies as extract_chrome_cookies  # noqa: E402
-
-import nodriver as uc  # noqa: E402
-from nodriver import cdp  # noqa: E402
-
 from cdp_parser import parse_cdp_response  # noqa: E402
+import fastjson  # noqa: E402
 
 SCREENSHOT_DIR = Path(__file__).parent.parent / "data" / "screenshots"
 SOCKET_PATH = Path(__file__).parent.parent / "data" / "pool.sock"
 
 
-async def inject_cookies(browser, cookies: list, domain_filter: str):
+# Result schemas. Adapters return plain dicts (the CLI prints them as JSON and
+# the tracker reads them with .get()), so these are TypedDicts: they document
+# and type-check the contract without adding a wrapper object per call.
+# Site-specific keys (asin / item_number, prime, ...) are allowed alongside.
+class SearchResult(TypedDict, total=False):
+    success: bool
+    error: str
+    query: str
+    result_count: int
+    results: list
+    screenshot: str
+
+
+class PriceResult(TypedDict, total=False):
+    success: bool
+    error: str
+    title: str | None
+    price: str | None
+    list_price: str | None
+    discount_pct: str | None
+    availability: str | None
+    in_stock: bool
+    seller: str | None
+    shipping: str | None
+    deal_badge: str | None
+    coupon: str | None
+    rating: str | None
+    reviews: str | None
+    url: str
+    screenshot: str
+
+
+class CartResult(TypedDict, total=False):
+    success: bool
+    error: str
+    added: bool
+    product: str | None
+    cart_count: str
+    items: list
+    subtotal: str | None
+    url: str
+    screenshot: str
+
+# In-page readiness gate: resolves once the document is past the "loading"
+# state and `selector` matches (or, with no selector, once the document has
+# finished loading). A document marked by _goto() as being navigated away from
+# never satisfies it, so a reused tab's previous page can't pass the gate
+# (whatever URL the new page ends up on after redirects). Event-driven: a
+# MutationObserver and readystatechange re-check only when something changes,
+# instead of a fixed sleep or a polling loop. Capped at `timeoutMs`.
+_LEAVING_JS = "document.__shopperLeaving = true"
+_READY_JS = """
+    (selector, timeoutMs) => new Promise(resolve => {
+        const ready = () => !document.__shopperLeaving && (
+            selector ? document.readyState !== 'loading' && document.querySelector(selector)
+                     : document.readyState === 'complete');
+        if (ready()) return resolve();
+
+        let mo = null;
+        let timer = null;
+        const done = () => {
+            if (mo) mo.disconnect();
+            clearTimeout(timer);
+            document.removeEventListener('readystatechange', onChange);
+            resolve();
+        };
+        const onChange = () => { if (ready()) done(); };
+
+        timer = setTimeout(done, timeoutMs);
+        document.addEventListener('readystatechange', onChange);
+        if (selector) {
+            mo = new MutationObserver(onChange);
+            mo.observe(document.documentElement, { childList: true, subtree: true });
+        }
+    })
+"""
+
+
+async def inject_cookies(browser, cookies: list, domain_filter: str,
+                         browser_context_id: str = None):
     """Inject cookies into browser via CDP. Shared across all adapters.
 
     Args:
         browser: nodriver Browser instance
         cookies: List of cookie dicts from chrome_cookies
         domain_filter: Domain to filter cookies for (e.g. "amazon.com")
+        browser_context_id: Browser context to set them in (default context if None)
     Returns:
         Number of cookies injected
     """
-    injected = 0
+    from nodriver import cdp
+
+    CookieSameSite = cdp.network.CookieSameSite
+    CookieParam = cdp.network.CookieParam
+    # A cookie belongs to the site if it is set on the domain itself or one
+    # of its subdomains (www.amazon.com, smile.amazon.com, ...).
+    suffix = "." + domain_filter
+    if browser_context_id is not None:
+        browser_context_id = cdp.browser.BrowserContextID(browser_context_id)
+
+    params = []
     for c in cookies:
         if not c.get("value"):
             continue
         cookie_domain = c.get("domain", "").lstrip(".")
-        if domain_filter not in cookie_domain and cookie_domain not in domain_filter:
+        if cookie_domain != domain_filter and not cookie_domain.endswith(suffix):
             continue
         try:
             same_site = None
             if c.get("same_site") in ("Strict", "Lax", "None"):
-                same_site = cdp.network.CookieSameSite(c["same_site"])
-            param = cdp.network.CookieParam(
+                same_site = CookieSameSite(c["same_site"])
+            params.append(CookieParam(
                 name=c["name"], value=c["value"],
                 domain=c.get("domain"), path=c.get("path", "/"),
                 secure=c.get("secure", False),
                 http_only=c.get("http_only", False),
                 same_site=same_site,
-            )
-            await browser.connection.send(cdp.storage.set_cookies([param]))
+            ))
+        except Exception:
+            pass
+    if not params:
+        return 0
+
+    # One round-trip for the whole jar. If Chrome rejects the batch (one bad
+    # cookie fails the call), fall back to best-effort per-cookie sends.
+    try:
+        await browser.connection.send(cdp.storage.set_cookies(params, browser_context_id))
+        return len(params)
+    except Exception:
+        pass
+
+    injected = 0
+    for param in params:
+        try:
+            await browser.connection.send(cdp.storage.set_cookies([param], browser_context_id))
             injected += 1
         except Exception:
             pass
     return injected
 
 
+# Decrypted cookie jars, per domain, reused by every adapter in the process for
+# COOKIE_TTL seconds. Decryption goes through the OS keychain, so check-all
+# and bulk lookups should pay for it once, not once per browser launch.
+COOKIE_TTL = 60
+_cookie_cache = {}  # domain → (time.monotonic() at extraction, result)
+
+
+def _extract_cookies_cached(domain: str) -> dict:
+    """extract_chrome_cookies([domain]) with a short per-process cache."""
+    from chrome_cookies import extract_cookies as extract_chrome_cookies
+
+    hit = _cookie_cache.get(domain)
+    if hit and time.monotonic() - hit[0] < COOKIE_TTL:
+        return hit[1]
+    result = extract_chrome_cookies([domain], decrypt=True)
+    if result.get("success"):
+        _cookie_cache[domain] = (time.monotonic(), result)
+    return result
+
+
+class _PoolConnection:
+    """Unix-socket connections to the pool daemon, shared by all adapters.
+
+    Connections are opened on demand and kept for the life of the process
+    instead of one connect/close per request. The daemon answers each
+    connection's requests in order, so a request takes an idle connection
+    (or opens one) for its round-trip: concurrent acquires, e.g. one per
+    site in check-all, each get their own socket and are served in parallel.
+    Connections are reopened if the daemon dropped them or they belong to an
+    earlier event loop.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._loop = None
+        self._idle = []  # (reader, writer) pairs not in use
+
+    @staticmethod
+    def _close(writer):
+        try:
+            writer.close()
+        except Exception:
+            pass
+
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Streams are bound to the loop that created them. The old
+            # sockets are shut down so the daemon doesn't hold dead clients
+            # open until they idle out; that loop is usually closed already,
+            # which leaves writer.close() unable to run.
+            for _, writer in self._idle:
+                try:
+                    writer.get_extra_info("socket").shutdown(socket.SHUT_RDWR)
+                except Exception:
+                    pass
+                self._close(writer)
+            self._loop, self._idle = loop, []
+
+    async def _checkout(self):
+        """An idle connection (reused=True) or a newly opened one."""
+        while self._idle:
+            reader, writer = self._idle.pop()
+            if not writer.is_closing():
+                return reader, writer, True
+        reader, writer = await asyncio.open_unix_connection(str(self.path))
+        return reader, writer, False
+
+    async def rpc(self, request: dict, timeout: float = 10) -> dict:
+        """Send one request and return the daemon's reply."""
+        self._bind_loop()
+        reader, writer, reused = await self._checkout()
+        try:
+            reply = await self._exchange(reader, writer, request, timeout)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            self._close(writer)
+            if not reused:
+                raise
+        except BaseException:
+            self._close(writer)  # a late reply would answer the next request
+            raise
+        else:
+            self._idle.append((reader, writer))
+            return reply
+        # The kept-open socket had gone stale (e.g. daemon restart): retry once.
+        reader, writer = await asyncio.open_unix_connection(str(self.path))
+        try:
+            reply = await self._exchange(reader, writer, request, timeout)
+        except BaseException:
+            self._close(writer)
+            raise
+        self._idle.append((reader, writer))
+        return reply
+
+    async def notify(self, request: dict):
+        """Send a request without waiting for (or getting) a reply.
+
+        The request is marked "noreply" so the daemon sends nothing back that
+        a later rpc() could mistake for its own answer. Delivery is best
+        effort: the bytes are handed to the socket and not drained.
+        """
+        self._bind_loop()
+        reader, writer, _ = await self._checkout()
+        writer.write(fastjson.dumpb({**request, "noreply": True}) + b"\n")
+        self._idle.append((reader, writer))
+
+    @staticmethod
+    async def _exchange(reader, writer, request: dict, timeout: float) -> dict:
+        writer.write(fastjson.dumpb(request) + b"\n")
+        await writer.drain()
+        async with asyncio.timeout(timeout):
+            line = await reader.readline()
+        if not line:
+            raise ConnectionResetError("pool daemon closed the connection")
+        return fastjson.loads(line)
+
+
+_pool = _PoolConnection(SOCKET_PATH)
+
+
+def _write_screenshot(path: str, data: str):
+    """Decode a base64 CDP screenshot and write it to `path`."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(base64.b64decode(data))
+
+
 class ShopperBase(ABC):
     """Abstract base for shopping site adapters."""
 
     DOMAIN: str = ""           # e.g. "amazon.com"
     DISPLAY_NAME: str = ""     # e.g. "Amazon"
+    PRODUCT_ID_KEY: str = "product_id"  # result key for the site's id, e.g. "asin"
+
+    # Named page extractors (name → JS function source). They are installed
+    # once per tab as window.__shopper.<name>, so js_call() can ship just the
+    # name and arguments instead of the whole function body.
+    EXTRACTORS: dict = {}
+    # Optional JS statements (constants, helpers) the extractors close over.
+    # Runs once per document inside the bundle, ahead of the extractors.
+    EXTRACTOR_PRELUDE: str = ""
 
     def __init__(self):
         self.browser = None
         self.page = None
         self._from_pool = False
         self._owns_browser = False
+        self._context_id = None    # pool browser context our tabs belong in
+        self._extractor_tabs = []  # tabs with the extractor bundle installed
+        self._close_task = None    # pending background close, if any
+        self._session_depth = 0    # nesting level of session() blocks
 
     async def ensure_browser(self):
         """Get a browser instance — from pool if available, else fresh."""
+        await self.wait_closed()
+        if self._session_depth and self.browser:
+            return  # reuse the browser held open by session()
         if SOCKET_PATH.exists():
             try:
                 self.browser, self.page = await self._acquire_from_pool()
                 self._from_pool = True
+                await self._install_extractors(self.page)
                 return
             except Exception as e:
                 print(f"[shopping] Pool acquire failed: {e}", file=sys.stderr)
         self.browser, self.page, _ = await self._create_authed_browser()
         self._owns_browser = True
+        if self.page:
+            await self._install_extractors(self.page)
 
     async def _create_authed_browser(self):
         """Create a nodriver browser with auth cookies for this site."""
-        cookie_result = extract_chrome_cookies([self.DOMAIN], decrypt=True)
+        import nodriver as uc
+        from config import BROWSER_ARGS
+
+        # Cookie decryption runs in a thread while Chrome launches. Either can
+        # fail without cancelling the other, so a Chrome that did start is
+        # always stopped before an extraction error propagates.
+        cookie_result, browser = await asyncio.gather(
+            asyncio.to_thread(_extract_cookies_cached, self.DOMAIN),
+            uc.start(headless=True, browser_args=BROWSER_ARGS),
+            return_exceptions=True,
+        )
+        if isinstance(browser, BaseException):
+            raise browser
+        if isinstance(cookie_result, BaseException):
+            browser.stop()
+            raise cookie_result
         if not cookie_result.get("success"):
+            browser.stop()
             return None, None, 0
 
-        cookies = cookie_result["cookies"]
-        browser = await uc.start(headless=True, browser_args=BROWSER_ARGS)
+        # Cookies carry explicit domains, so they can go in before the first
+        # navigation; the landing page then loads already authenticated.
+        injected = await inject_cookies(browser, cookie_result["cookies"], self.DOMAIN)
         page = await browser.get(f"https://www.{self.DOMAIN}")
-        await page.sleep(1)
-
-        injected = await inject_cookies(browser, cookies, self.DOMAIN)
         return browser, page, injected
 
     async def _acquire_from_pool(self):
         """Acquire browser from session pool daemon via Unix socket."""
-        import asyncio
-        import json
-
-        reader, writer = await asyncio.open_unix_connection(str(SOCKET_PATH))
-        request = json.dumps({"action": "acquire", "domain": self.DOMAIN})
-        writer.write(request.encode() + b"\n")
-        await writer.drain()
+        import nodriver as uc
 
         # Cold starts take 10-15s (Chrome launch + navigate + cookies), warm is instant
-        response = await asyncio.wait_for(reader.readline(), timeout=30)
-        writer.close()
-        await writer.wait_closed()
-
-        data = json.loads(response.decode())
+        data = await _pool.rpc({"action": "acquire", "domain": self.DOMAIN}, timeout=30)
         if not data.get("success"):
             raise RuntimeError(data.get("error", "Pool acquire failed"))
 
@@ -121,19 +382,286 @@ class ShopperBase(ABC):
         host = data["host"]
         port = data["port"]
         browser = await uc.Browser.create(config=uc.Config(host=host, port=port))
-        page = browser.main_tab
+
+        # The daemon's Chrome is shared by every site: use the tab it opened
+        # in this site's browser context, and open any extra tabs there too.
+        self._context_id = data.get("browser_context_id")
+        target_id = data.get("target_id")
+        page = await self._tab_for_target(browser, target_id) if target_id else browser.main_tab
         return browser, page
 
-    async def navigate(self, url: str, wait: int = 3):
-        """Navigate to URL and wait for page load."""
-        self.page = await self.browser.get(url)
-        await self.page.sleep(wait)
+    @staticmethod
+    async def _tab_for_target(browser, target_id: str):
+        """The tab object for a CDP target id, refreshing the target list once."""
+        for attempt in range(2):
+            for tab in browser.tabs:
+                if tab.target.target_id == target_id:
+                    return tab
+            if not attempt:
+                await browser.update_targets()
+        raise RuntimeError(f"Pool tab {target_id} not found")
+
+    async def _new_tab(self):
+        """Open a blank tab in this adapter's browser (and pool context, if any)."""
+        if not self._context_id:
+            return await self.browser.get("about:blank", new_tab=True)
+        from nodriver import cdp
+
+        target_id = await self.browser.connection.send(cdp.target.create_target(
+            "about:blank", browser_context_id=cdp.browser.BrowserContextID(self._context_id)
+        ))
+        return await self._tab_for_target(self.browser, target_id)
+
+    async def navigate(self, url: str, wait: float = 3, ready_selector: str = None):
+        """Navigate to URL and wait for the page to be ready.
+
+        Returns as soon as the document has loaded (or `ready_selector`
+        matches), rather than after a fixed sleep; `wait` is the upper bound
+        in seconds.
+        """
+        return await self.navigate_until(url, ready_selector, wait)
+
+    async def navigate_until(self, url: str, selector: str = None, timeout: float = 8):
+        """Navigate to URL and return once `selector` matches.
+
+        The wait is event-driven (see _READY_JS): it ends as soon as the
+        extraction target is in the DOM (or, with no selector, when the
+        document has loaded), capped at `timeout` seconds.
+        """
+        await self._goto(self.page, url)
+        await self._wait_ready(self.page, selector, timeout)
         return self.page
 
-    async def evaluate(self, js: str) -> dict:
-        """Evaluate JS and parse CDP response to plain Python types."""
-        raw = await self.page.evaluate(js)
-        return parse_cdp_response(raw)
+    async def _goto(self, page, url: str):
+        """Navigate `page` to `url`, first marking its current document as
+        outgoing so _READY_JS can't resolve on it."""
+        try:
+            await self.evaluate(_LEAVING_JS, page=page)
+        except Exception:
+            pass  # nothing usable loaded yet, so nothing to mistake for the new page
+        # Navigate the tab itself: browser.get() would use the browser's first
+        # tab, which in the shared pool Chrome belongs to another context.
+        await page.get(url)
+
+    async def _wait_ready(self, page, selector: str = None, timeout: float = 8):
+        """Block until `selector` matches on `page` (see _READY_JS)."""
+        await self.evaluate(
+            self.js_call("ready", selector, int(timeout * 1000), page=page),
+            await_promise=True,
+            page=page,
+        )
+
+    async def evaluate(self, js: str, await_promise: bool = False, page=None,
+                       as_json: bool = True) -> dict:
+        """Evaluate JS and return the result as plain Python types.
+
+        Sends Runtime.evaluate with returnByValue, so Chrome hands back the
+        result as JSON in one message rather than a deep-serialized
+        RemoteObject tree that has to be unpacked property by property.
+        Runs on `page` if given, else on the adapter's current page.
+
+        By default (`as_json`) the result is JSON.stringify'd in the page and
+        decoded with fastjson, skipping CDP's object serialization entirely;
+        the value comes back exactly as the script returned it. Pass
+        as_json=False for results JSON can't represent.
+
+        Either way, a scalar result (string, number, bool, null) is returned
+        as the bare Python value.
+        """
+        from nodriver import cdp
+
+        if as_json:
+            if await_promise:
+                js = f"Promise.resolve({js}).then(r => JSON.stringify(r))"
+            else:
+                js = f"JSON.stringify({js})"
+        remote, errors = await (page or self.page).send(cdp.runtime.evaluate(
+            expression=js,
+            user_gesture=True,
+            await_promise=await_promise,
+            return_by_value=True,
+            allow_unsafe_eval_blocked_by_csp=True,
+        ))
+        if errors:
+            detail = errors.exception.description if errors.exception else errors.text
+            raise RuntimeError(f"JS evaluation failed: {detail}")
+        value = remote.value if remote else None
+        if as_json and isinstance(value, str):
+            return fastjson.loads(value)
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return value  # scalars come back as-is, never as {"value": ...}
+        return parse_cdp_response(value)
+
+    async def save_screenshot(self, path: str, page=None) -> str:
+        """Screenshot `page` (default the adapter's page) to `path`.
+
+        Only the CDP capture runs on the event loop; decoding and the file
+        write happen in a worker thread.
+        """
+        data = await (page or self.page).save_screenshot(as_base64=True)
+        await asyncio.to_thread(_write_screenshot, path, data)
+        return path
+
+    async def evaluate_with_screenshot(self, js: str, screenshot: str = None, **kwargs):
+        """evaluate(js, **kwargs), saving `screenshot` of the same page concurrently."""
+        if not screenshot:
+            return await self.evaluate(js, **kwargs)
+        data, _ = await asyncio.gather(
+            self.evaluate(js, **kwargs),
+            self.save_screenshot(screenshot, page=kwargs.get("page")),
+        )
+        return data
+
+    @classmethod
+    def _extractor_sources(cls) -> dict:
+        """All in-page helpers for this adapter, including the readiness gate."""
+        return {"ready": _READY_JS, **cls.EXTRACTORS}
+
+    @classmethod
+    def _extractor_bundle(cls) -> str:
+        """JS that defines window.__shopper with every extractor for this adapter.
+
+        Versioned by content hash, so re-registering the same bundle on a pooled
+        tab is a no-op and a newer bundle replaces an older one.
+        """
+        body = ", ".join(
+            f"{json.dumps(name)}: ({src.strip()})"
+            for name, src in cls._extractor_sources().items()
+        )
+        prelude = cls.EXTRACTOR_PRELUDE.strip()
+        version = hashlib.sha1(f"{prelude}\n{body}".encode()).hexdigest()[:12]
+        return (
+            f"(() => {{ if (window.__shopper && window.__shopper.__v === {json.dumps(version)}) return;"
+            f" {prelude}\n window.__shopper = {{ __v: {json.dumps(version)}, {body} }}; }})()"
+        )
+
+    async def _install_extractors(self, page):
+        """Register the extractor bundle on a tab for every future document.
+
+        Also evaluates it in the current document, so the named helpers are
+        usable before the next navigation. Failures are non-fatal: js_call()
+        falls back to shipping function sources for tabs without the bundle.
+        """
+        if any(t is page for t in self._extractor_tabs):
+            return
+        from nodriver import cdp
+
+        bundle = self._extractor_bundle()
+        try:
+            await page.send(cdp.page.add_script_to_evaluate_on_new_document(source=bundle))
+            await page.evaluate(bundle)
+            self._extractor_tabs.append(page)
+        except Exception as e:
+            print(f"[shopping] Extractor install failed: {e}", file=sys.stderr)
+
+    def js_call(self, fn: str, *args, page=None) -> str:
+        """Build a call expression for a named extractor or a JS function source.
+
+        Registered names (see EXTRACTORS) become `window.__shopper.<name>(...)`
+        once the target tab (`page`, default the adapter's page) has the bundle
+        installed; otherwise the function source is sent inline. Arguments are
+        passed as JSON literals instead of being interpolated into the
+        function body, so string inputs need no hand escaping.
+        """
+        arglist = ", ".join(fastjson.dumps(a) for a in args)
+        src = self._extractor_sources().get(fn)
+        if src is not None:
+            page = page or self.page
+            if any(t is page for t in self._extractor_tabs):
+                return f"window.__shopper.{fn}({arglist})"
+            fn = src
+            if self.EXTRACTOR_PRELUDE and fn is not _READY_JS:
+                fn = f"(() => {{ {self.EXTRACTOR_PRELUDE.strip()}\n return ({src.strip()}); }})()"
+        return f"({fn})({arglist})"
+
+    async def settle_and_eval(self, js: str, wait_selector: str = None, timeout: float = 4,
+                              as_json: bool = True, page=None) -> dict:
+        """Wait for the page to settle, then evaluate `js`, in one round-trip.
+
+        The readiness wait runs in-page (see _READY_JS) and `js` is evaluated
+        as soon as it resolves, instead of a fixed Python-side sleep followed
+        by a separate evaluate call.
+        """
+        ready = self.js_call("ready", wait_selector, int(timeout * 1000), page=page)
+        return await self.evaluate(
+            f"(async () => {{ await {ready}; return ({js}); }})()",
+            await_promise=True,
+            page=page,
+            as_json=as_json,
+        )
+
+    async def _nav_and_eval(self, url: str, js: str, wait_selector: str = None, timeout: float = 4,
+                            as_json: bool = True) -> dict:
+        """Navigate to URL, then settle + extract with a single evaluate."""
+        await self._goto(self.page, url)
+        return await self.settle_and_eval(js, wait_selector, timeout, as_json=as_json)
+
+    async def _navigate_and_extract(self, page, url: str, js: str, wait_selector: str = None,
+                                    timeout: float = 8, screenshot: str = None):
+        """Load `url` on `page`, wait for `wait_selector`, then evaluate `js` there
+        (screenshotting alongside if asked)."""
+        await self._goto(page, url)
+        await self._wait_ready(page, wait_selector, timeout)
+        return await self.evaluate_with_screenshot(js, screenshot, page=page)
+
+    async def bulk_fetch(self, items: list, fetch_one, concurrency: int = 8) -> list:
+        """Run `fetch_one(page, item)` for every item, across up to `concurrency` tabs.
+
+        Tabs (the adapter's page plus new ones, opened on demand) are reused as
+        items finish, so the per-page load waits overlap instead of adding up.
+        The caller must already hold a browser. `fetch_one` should handle its
+        own errors; one raising cancels the batch. Results are in input order.
+        """
+        limit = asyncio.Semaphore(concurrency)
+        idle = [self.page]
+        opened = []
+
+        async def run(item):
+            async with limit:
+                if idle:
+                    page = idle.pop()
+                else:
+                    page = await self._new_tab()
+                    opened.append(page)
+                    await self._install_extractors(page)
+                try:
+                    return await fetch_one(page, item)
+                finally:
+                    idle.append(page)
+
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tasks = [tg.create_task(run(item)) for item in items]
+            return [t.result() for t in tasks]
+        finally:
+            for page in opened:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+            self._extractor_tabs = [t for t in self._extractor_tabs
+                                    if not any(t is p for p in opened)]
+
+    async def bulk_check_price(self, product_ids: list, concurrency: int = 8) -> list:
+        """Check prices for several products in one browser session.
+
+        Returns one check_price-style result per id, in input order; a failed
+        lookup yields an error result instead of failing the batch.
+        """
+        await self.ensure_browser()
+        if not self.browser:
+            return [{"success": False, "error": "Cookie extraction failed"} for _ in product_ids]
+
+        async def check_one(page, product_id):
+            try:
+                return await self._check_price_on_page(page, product_id)
+            except Exception as e:
+                return {"success": False, "error": str(e), self.PRODUCT_ID_KEY: product_id}
+
+        try:
+            return await self.bulk_fetch(product_ids, check_one, concurrency)
+        finally:
+            self._schedule_close()
 
     async def close(self):
         """Release browser — return to pool or stop."""
@@ -144,41 +672,90 @@ class ShopperBase(ABC):
                     await self.browser.connection.disconnect()
             except Exception:
                 pass
-            # Tell daemon we're done
+            # Tell daemon we're done; nothing in the reply is needed
             try:
-                import asyncio
-                import json
-                reader, writer = await asyncio.open_unix_connection(str(SOCKET_PATH))
-                request = json.dumps({"action": "release", "domain": self.DOMAIN})
-                writer.write(request.encode() + b"\n")
-                await writer.drain()
-                writer.close()
-                await writer.wait_closed()
+                await _pool.notify({"action": "release", "domain": self.DOMAIN})
             except Exception:
                 pass
         elif self._owns_browser and self.browser:
             self.browser.stop()
 
+        self.browser = None
+        self.page = None
+        self._from_pool = False
+        self._owns_browser = False
+        self._context_id = None
+        self._extractor_tabs = []
+
+    @asynccontextmanager
+    async def session(self):
+        """Keep one browser open across several calls on this adapter.
+
+            async with shopper.session():
+                await shopper.search("rtx 5090")
+                await shopper.check_price("B0DN1492LG")
+
+        Calls inside the block share the browser; it is released when the
+        outermost block exits. Nested blocks are fine.
+        """
+        self._session_depth += 1
+        try:
+            yield self
+        finally:
+            self._session_depth -= 1
+            if self._session_depth == 0:
+                await self.wait_closed()
+                if self.browser:
+                    await self.close()
+
+    def _schedule_close(self):
+        """Release the browser in a background task so results return first.
+
+        At most one close is pending per instance; ensure_browser() and
+        wait_closed() await it before the browser state is reused.
+        """
+        if self._session_depth:
+            return  # session() releases the browser on exit
+        if self._close_task and not self._close_task.done():
+            return
+        self._close_task = asyncio.get_running_loop().create_task(self._close_with_log())
+
+    async def _close_with_log(self):
+        try:
+            await self.close()
+        except Exception as e:
+            print(f"[shopping] Browser close failed: {e}", file=sys.stderr)
+
+    async def wait_closed(self):
+        """Wait for a close scheduled by _schedule_close() to finish."""
+        task, self._close_task = self._close_task, None
+        if task:
+            await task
+
     # ── Abstract methods (must implement) ─────────────────────────────────
 
     @abstractmethod
-    async def search(self, query: str, limit: int = 5) -> dict:
+    async def search(self, query: str, limit: int = 5) -> SearchResult:
         """Search for products."""
 
     @abstractmethod
-    async def check_price(self, product_id: str) -> dict:
+    async def check_price(self, product_id: str) -> PriceResult:
         """Get price/availability for a product."""
 
     @abstractmethod
-    async def product_details(self, product_id: str) -> dict:
+    async def product_details(self, product_id: str) -> PriceResult:
         """Get full product details."""
 
+    @abstractmethod
+    async def _check_price_on_page(self, page, product_id: str, screenshot: str = None) -> PriceResult:
+        """check_price against an already-open tab (used by bulk_check_price)."""
+
     # ── Optional methods (not all sites support) ──────────────────────────
 
-    async def add_to_cart(self, product_id: str) -> dict:
+    async def add_to_cart(self, product_id: str) -> CartResult:
         return {"success": False, "error": f"{self.DISPLAY_NAME} add-to-cart not implemented"}
 
-    async def view_cart(self) -> dict:
+    async def view_cart(self) -> CartResult:
         return {"success": False, "error": f"{self.DISPLAY_NAME} cart not implemented"}
 
     async def my_orders(self, limit: int = 10) -> dict:
@@ -5,8 +5,12 @@ nodriver returns CDP values as list-of-tuples: [(key, {type, value}), ...]
 This module converts them to plain Python dicts/lists/scalars.
 """
 
+from typing import Any, Callable
 
-def parse_cdp_response(data) -> dict:
+_Push = Callable[[tuple], None]
+
+
+def parse_cdp_response(data: object) -> dict | list:
     """Convert nodriver's evaluate() response to a plain Python dict.
 
     Handles both the tuple-list format (current nodriver) and plain dicts
@@ -36,44 +40,81 @@ def parse_cdp_response(data) -> dict:
     return result
 
 
-def _parse_value(raw):
-    """Recursively parse a CDP value descriptor.
+# Descriptor handlers, keyed by the descriptor's "type". Each one stores the
+# parsed value in parent[slot]; containers push their children onto the
+# walk stack (see _parse_value) instead of parsing them in place.
 
-    CDP value descriptors have a 'type' field indicating the JS type:
-      - null/undefined → None
-      - boolean → True/False
-      - number → int/float
-      - string → str
-      - array → list (recursive)
-      - object → dict (recursive)
-    """
-    if not isinstance(raw, dict):
-        return raw
+def _h_none(raw: dict, parent: Any, slot: Any, push: _Push) -> None:
+    parent[slot] = None
+
+
+def _h_bool(raw: dict, parent: Any, slot: Any, push: _Push) -> None:
+    parent[slot] = raw.get("value", False)
+
+
+def _h_value(raw: dict, parent: Any, slot: Any, push: _Push) -> None:
+    parent[slot] = raw.get("value")
 
-    t = raw.get("type")
 
-    if t in ("null", "undefined"):
-        return None
+def _h_array(raw: dict, parent: Any, slot: Any, push: _Push) -> None:
+    items = raw.get("value", [])
+    out = parent[slot] = [None] * len(items)
+    for i, v in enumerate(items):
+        push((out, i, v))
 
-    if t == "boolean":
-        return raw.get("value", False)
 
-    if t in ("number", "string"):
-        return raw.get("value")
+def _h_object(raw: dict, parent: Any, slot: Any, push: _Push) -> None:
+    props = raw.get("value", [])
+    if isinstance(props, list):
+        obj = parent[slot] = {}
+        for prop in props:
+            if isinstance(prop, (list, tuple)) and len(prop) == 2:
+                obj[prop[0]] = None  # reserve the slot to keep key order
+                push((obj, prop[0], prop[1]))
+    else:
+        parent[slot] = props
 
-    if t == "array":
-        items = raw.get("value", [])
-        return [_parse_value(v) for v in items]
 
-    if t == "object":
-        props = raw.get("value", [])
-        if isinstance(props, list):
-            obj = {}
-            for prop in props:
-                if isinstance(prop, (list, tuple)) and len(prop) == 2:
-                    obj[prop[0]] = _parse_value(prop[1])
-            return obj
-        return props
+def _h_fallback(raw: dict, parent: Any, slot: Any, push: _Push) -> None:
+    # Value directly if present, else the whole descriptor
+    parent[slot] = raw.get("value", raw)
 
-    # Fallback: return value directly if present, else the whole descriptor
-    return raw.get("value", raw)
+
+_HANDLERS: dict[str, Callable[[dict, Any, Any, _Push], None]] = {
+    "null": _h_none,
+    "undefined": _h_none,
+    "boolean": _h_bool,
+    "number": _h_value,
+    "string": _h_value,
+    "array": _h_array,
+    "object": _h_object,
+}
+
+
+def _parse_value(raw: object) -> Any:
+    """Parse a CDP value descriptor.
+
+    CDP value descriptors have a 'type' field indicating the JS type:
+      - null/undefined → None
+      - boolean → True/False
+      - number → int/float
+      - string → str
+      - array → list
+      - object → dict
+
+    Nested arrays/objects are walked with an explicit stack rather than by
+    recursion: each entry is (container, slot, descriptor), and containers
+    are created up front so children can be written into their slot. Each
+    descriptor is handled by its entry in _HANDLERS.
+    """
+    root: list = [None]
+    stack: list[tuple[Any, Any, object]] = [(root, 0, raw)]
+    pop, push = stack.pop, stack.append
+    handler_for = _HANDLERS.get
+    while stack:
+        parent, slot, raw = pop()
+        if type(raw) is not dict:
+            parent[slot] = raw
+            continue
+        handler_for(raw.get("type"), _h_fallback)(raw, parent, slot, push)
+    return root[0]
@@ -18,7 +18,6 @@ Usage:
 
 import argparse
 import asyncio
-import json
 import sys
 from pathlib import Path
 
@@ -26,6 +25,8 @@ from pathlib import Path
 SCRIPTS_DIR = Path(__file__).parent
 sys.path.insert(0, str(SCRIPTS_DIR))
 
+import fastjson
+
 
 def get_adapter(site: str):
     """Get an adapter instance for a site."""
@@ -34,12 +35,91 @@ def get_adapter(site: str):
     return cls()
 
 
+_adapters_by_site = {}
+
+
 def adapter_factory(site: str):
-    """Factory function for PriceTracker.check_all()."""
-    return get_adapter(site)
+    """Factory function for PriceTracker.check_all() — one adapter per site."""
+    if site not in _adapters_by_site:
+        _adapters_by_site[site] = get_adapter(site)
+    return _adapters_by_site[site]
+
+
+def _add_site_actions(site_parser):
+    """Add the action subparsers (search, check-price, ...) to a site parser."""
+    site_sub = site_parser.add_subparsers(dest="action")
+
+    # search
+    p = site_sub.add_parser("search", help="Search products")
+    p.add_argument("query", help="Search query")
+    p.add_argument("--limit", "-n", type=int, default=5)
+    p.add_argument("--screenshot", "-s")
+
+    # check-price
+    p = site_sub.add_parser("check-price", help="Get price/availability")
+    p.add_argument("product_id", help="Product ID (ASIN, Item#, etc.)")
+    p.add_argument("--screenshot", "-s")
+
+    # product
+    p = site_sub.add_parser("product", help="Full product details")
+    p.add_argument("product_id", help="Product ID")
+    p.add_argument("--screenshot", "-s")
+
+    # add-to-cart
+    p = site_sub.add_parser("add-to-cart", help="Add to cart")
+    p.add_argument("product_id", help="Product ID")
+    p.add_argument("--screenshot", "-s")
+
+    # cart
+    p = site_sub.add_parser("cart", help="View cart")
+    p.add_argument("--screenshot", "-s")
+
+    # my-orders
+    p = site_sub.add_parser("my-orders", help="List orders")
+    p.add_argument("--limit", "-n", type=int, default=10)
+    p.add_argument("--screenshot", "-s")
+
+
+def _install_fast_loop():
+    """Use uvloop for every asyncio.run() below when it is installed."""
+    try:
+        import uvloop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+
+def _prewarm_pool(argv: list):
+    """Ask a running pool daemon to start the browser this command will need.
+
+    Site actions and `track` always open the site's browser; telling the
+    daemon up front lets Chrome start while the CLI is still parsing
+    arguments and importing the adapter. Help requests and incomplete
+    commands are skipped, and nothing beyond the site registry is imported
+    unless the daemon's socket exists.
+    """
+    if len(argv) < 3 or "-h" in argv or "--help" in argv:
+        return
+    if not (SCRIPTS_DIR.parent / "data" / "pool.sock").exists():
+        return
+    from adapters import get_domain, list_sites
+
+    if argv[1] in list_sites() and argv[2] in _SITE_ACTIONS:
+        site = argv[1]
+    elif argv[1] == "track" and len(argv) > 3 and argv[2] in list_sites():
+        site = argv[2]
+    else:
+        return
+    domain = get_domain(site)
+    if domain:
+        from session_pool import notify
+        notify("prewarm", domain=domain)
 
 
 def main():
+    _install_fast_loop()
+    _prewarm_pool(sys.argv)
+
     parser = argparse.ArgumentParser(
         description="Shopping Browser — Multi-site shopping CLI",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -54,41 +134,13 @@ def main():
     sub = parser.add_subparsers(dest="command")
 
     # ── Site commands (amazon, newegg, etc.) ──────────────────────────────
-    # These are handled dynamically based on available adapters
+    # Every site is listed, but only the site named on the command line gets
+    # its action subparsers built.
     from adapters import list_sites
     for site in list_sites():
         site_parser = sub.add_parser(site, help=f"{site.title()} commands")
-        site_sub = site_parser.add_subparsers(dest="action")
-
-        # search
-        p = site_sub.add_parser("search", help="Search products")
-        p.add_argument("query", help="Search query")
-        p.add_argument("--limit", "-n", type=int, default=5)
-        p.add_argument("--screenshot", "-s")
-
-        # check-price
-        p = site_sub.add_parser("check-price", help="Get price/availability")
-        p.add_argument("product_id", help="Product ID (ASIN, Item#, etc.)")
-        p.add_argument("--screenshot", "-s")
-
-        # product
-        p = site_sub.add_parser("product", help="Full product details")
-        p.add_argument("product_id", help="Product ID")
-        p.add_argument("--screenshot", "-s")
-
-        # add-to-cart
-        p = site_sub.add_parser("add-to-cart", help="Add to cart")
-        p.add_argument("product_id", help="Product ID")
-        p.add_argument("--screenshot", "-s")
-
-        # cart
-        p = site_sub.add_parser("cart", help="View cart")
-        p.add_argument("--screenshot", "-s")
-
-        # my-orders
-        p = site_sub.add_parser("my-orders", help="List orders")
-        p.add_argument("--limit", "-n", type=int, default=10)
-        p.add_argument("--screenshot", "-s")
+        if len(sys.argv) > 1 and sys.argv[1] == site:
+            _add_site_actions(site_parser)
 
     # ── Tracking commands ─────────────────────────────────────────────────
 
@@ -123,43 +175,31 @@ def main():
         sys.exit(1)
 
     result = dispatch(args)
-    print(json.dumps(result, indent=2, default=str))
+    print(fastjson.pretty(result))
     sys.exit(0 if result.get("success") else 1)
 
 
 def dispatch(args) -> dict:
     """Route command to the appropriate handler."""
-    cmd = args.command
-
-    # Pool commands
-    if cmd == "pool":
-        from session_pool import cmd_start, cmd_stop, cmd_status
-        if args.pool_action == "start":
-            return cmd_start() or {"success": True}  # None in daemon child
-        elif args.pool_action == "stop":
-            cmd_stop()
-            return {"success": True}
-        elif args.pool_action == "status":
-            return cmd_status()
-
-    # Tracking commands
-    if cmd == "track":
-        return _cmd_track(args)
-    if cmd == "untrack":
-        return _cmd_untrack(args)
-    if cmd == "history":
-        return _cmd_history(args)
-    if cmd == "alerts":
-        return _cmd_alerts(args)
-    if cmd == "check-all":
-        return asyncio.run(_cmd_check_all())
-    if cmd == "ack-alerts":
-        return _cmd_ack_alerts()
+    handler = _COMMANDS.get(args.command)
+    if handler:
+        return handler(args)
 
     # Site commands
     return asyncio.run(_dispatch_site(args))
 
 
+def _cmd_pool(args) -> dict:
+    from session_pool import cmd_start, cmd_stop, cmd_status
+    if args.pool_action == "start":
+        return cmd_start()
+    elif args.pool_action == "stop":
+        cmd_stop()
+        return {"success": True}
+    elif args.pool_action == "status":
+        return cmd_status()
+
+
 async def _dispatch_site(args) -> dict:
     """Dispatch a site-specific command."""
     site = args.command
@@ -168,49 +208,64 @@ async def _dispatch_site(args) -> dict:
         return {"success": False, "error": f"No action specified for {site}"}
 
     adapter = get_adapter(site)
-    screenshot = getattr(args, "screenshot", None)
-
-    if action == "search":
-        return await adapter.search(args.query, args.limit, screenshot)
-    elif action == "check-price":
-        return await adapter.check_price(args.product_id, screenshot)
-    elif action == "product":
-        return await adapter.product_details(args.product_id, screenshot)
-    elif action == "add-to-cart":
-        return await adapter.add_to_cart(args.product_id, screenshot)
-    elif action == "cart":
-        return await adapter.view_cart(screenshot)
-    elif action == "my-orders":
-        return await adapter.my_orders(args.limit, screenshot)
-    else:
+    try:
+        return await _run_site_action(adapter, action, args)
+    finally:
+        # Adapters close their browser in the background; let that finish
+        # before asyncio.run() tears the loop down and orphans Chrome.
+        await adapter.wait_closed()
+
+
+# Site action → (adapter method, positional args taken from the parsed
+# command line). The --screenshot path is always passed last.
+_SITE_ACTIONS = {
+    "search": ("search", lambda a: (a.query, a.limit)),
+    "check-price": ("check_price", lambda a: (a.product_id,)),
+    "product": ("product_details", lambda a: (a.product_id,)),
+    "add-to-cart": ("add_to_cart", lambda a: (a.product_id,)),
+    "cart": ("view_cart", lambda a: ()),
+    "my-orders": ("my_orders", lambda a: (a.limit,)),
+}
+
+
+async def _run_site_action(adapter, action: str, args) -> dict:
+    """Run one site action on an adapter instance."""
+    entry = _SITE_ACTIONS.get(action)
+    if entry is None:
         return {"success": False, "error": f"Unknown action: {action}"}
+    method, get_args = entry
+    screenshot = getattr(args, "screenshot", None)
+    return await getattr(adapter, method)(*get_args(args), screenshot)
 
 
-def _cmd_track(args) -> dict:
+async def _cmd_track(args) -> dict:
     """Start tracking a product — fetches current price first."""
     from db.tracker import PriceTracker
 
     # First, get current data
     adapter = get_adapter(args.site)
-    data = asyncio.run(adapter.check_price(args.product_id))
-
-    tracker = PriceTracker()
     try:
-        result = tracker.track(
-            args.site, args.product_id,
-            title=data.get("title"),
-            url=data.get("url"),
-        )
-
-        # Record initial price
-        if data.get("success"):
-            tracker.record_price(args.site, args.product_id, data)
-            result["initial_price"] = data.get("price")
-            result["title"] = data.get("title")
-
-        return result
+        data = await adapter.check_price(args.product_id)
+
+        tracker = PriceTracker()
+        try:
+            result = tracker.track(
+                args.site, args.product_id,
+                title=data.get("title"),
+                url=data.get("url"),
+            )
+
+            # Record initial price
+            if data.get("success"):
+                tracker.record_price(args.site, args.product_id, data)
+                result["initial_price"] = data.get("price")
+                result["title"] = data.get("title")
+
+            return result
+        finally:
+            tracker.close()
     finally:
-        tracker.close()
+        await adapter.wait_closed()
 
 
 def _cmd_untrack(args) -> dict:
@@ -258,5 +313,17 @@ async def _cmd_check_all() -> dict:
         tracker.close()
 
 
+# Top-level commands other than site names → handler(args)
+_COMMANDS = {
+    "pool": _cmd_pool,
+    "track": lambda args: asyncio.run(_cmd_track(args)),
+    "untrack": _cmd_untrack,
+    "history": _cmd_history,
+    "alerts": _cmd_alerts,
+    "check-all": lambda args: asyncio.run(_cmd_check_all()),
+    "ack-alerts": lambda args: _cmd_ack_alerts(),
+}
+
+
 if __name__ == "__main__":
     main()
@@ -3,6 +3,7 @@ SQLite schema for shopping-browser price tracking.
 """
 
 import sqlite3
+import threading
 from pathlib import Path
 
 DB_PATH = Path(__file__).parent.parent.parent / "data" / "prices.db"
@@ -19,6 +20,8 @@ CREATE TABLE IF NOT EXISTS products (
     tracked_since TEXT DEFAULT (datetime('now')),
     active INTEGER DEFAULT 1,
     alert_threshold REAL DEFAULT 5.0,
+    last_price REAL,
+    last_recorded_at TEXT,
     UNIQUE(site, product_id)
 );
 
@@ -36,8 +39,13 @@ CREATE TABLE IF NOT EXISTS price_history (
     recorded_at TEXT DEFAULT (datetime('now'))
 );
 
-CREATE INDEX IF NOT EXISTS idx_price_history_product_time
-    ON price_history(product_id, recorded_at);
+-- Covering index for "latest observation" and window queries: ordered by
+-- (recorded_at, id) per product and carrying the columns alert checks and
+-- summaries read, so they never touch the table. Replaces the original
+-- (product_id, recorded_at) index.
+DROP INDEX IF EXISTS idx_price_history_product_time;
+CREATE INDEX IF NOT EXISTS idx_ph_prod_time
+    ON price_history(product_id, recorded_at, id, price, in_stock, deal_badge);
 
 CREATE TABLE IF NOT EXISTS alerts (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -54,18 +62,75 @@ CREATE INDEX IF NOT EXISTS idx_alerts_unack
     ON alerts(acknowledged, created_at);
 """
 
+# products.last_price / last_recorded_at mirror the newest price_history row
+# so "current price" reads don't have to scan history. Applied after
+# _migrate() so the columns exist on databases created before them.
+TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS ph_update_last AFTER INSERT ON price_history
+BEGIN
+    UPDATE products SET last_price = NEW.price, last_recorded_at = NEW.recorded_at
+    WHERE id = NEW.product_id;
+END;
+"""
+
+
+def _migrate(conn: sqlite3.Connection):
+    """Add columns introduced after the first schema and backfill them."""
+    columns = {r["name"] for r in conn.execute("PRAGMA table_info(products)")}
+    if "last_price" in columns:
+        return
+    with conn:
+        conn.execute("ALTER TABLE products ADD COLUMN last_price REAL")
+        conn.execute("ALTER TABLE products ADD COLUMN last_recorded_at TEXT")
+        conn.execute(
+            """UPDATE products SET
+                   last_price = (SELECT price FROM price_history h
+                                 WHERE h.product_id = products.id
+                                 ORDER BY recorded_at DESC, id DESC LIMIT 1),
+                   last_recorded_at = (SELECT MAX(recorded_at) FROM price_history h
+                                       WHERE h.product_id = products.id)"""
+        )
+
+
+STATEMENT_CACHE = 512
+
+# Connections are opened once per thread and reused; see get_connection().
+_local = threading.local()
+
 
 def get_connection() -> sqlite3.Connection:
-    """Get a database connection, creating schema if needed."""
+    """Get this thread's database connection, creating schema if needed.
+
+    The first call per thread opens the database, applies SCHEMA (every
+    statement is IF NOT EXISTS, so this is idempotent), migrates older
+    databases, installs TRIGGERS and sets the
+    connection pragmas; later calls return the same connection.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        return conn
+
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(DB_PATH))
+    # Prepared statements are cached by SQL text. The batched writes build
+    # one statement per batch size, so allow more than the default 128.
+    conn = sqlite3.connect(str(DB_PATH), cached_statements=STATEMENT_CACHE)
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
-    # Check if tables exist
-    tables = conn.execute(
-        "SELECT name FROM sqlite_master WHERE type='table'"
-    ).fetchall()
-    table_names = {row["name"] for row in tables}
-    if "products" not in table_names:
-        conn.executescript(SCHEMA)
+    conn.executescript(SCHEMA)
+    _migrate(conn)
+    conn.executescript(TRIGGERS)
+    # WAL makes NORMAL durable against app crashes; only an OS crash can
+    # lose the last commits.
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA cache_size=-64000")
+    _local.conn = conn
     return conn
+
+
+def close_connection():
+    """Close this thread's cached connection, if any."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        _local.conn = None
+        conn.close()
@@ -2,23 +2,98 @@
 PriceTracker — SQLite-backed price tracking with alert generation.
 """
 
+import asyncio
 import re
+import sqlite3
 from datetime import datetime
 
 from .models import get_connection
 
 
+# Thousands separators, dropped before parsing
+_NO_COMMAS = str.maketrans("", "", ",")
+_NUMBER_RX = re.compile(r'\d+\.?\d*')
+
+
 def _parse_price(price_str: str | None) -> float | None:
     """Extract numeric price from string like '$209.99'."""
     if not price_str:
         return None
-    match = re.search(r'[\d,]+\.?\d*', price_str.replace(',', ''))
-    if match:
-        try:
-            return float(match.group())
-        except ValueError:
-            return None
-    return None
+    s = price_str.translate(_NO_COMMAS).lstrip("$ ")
+    # Plain "209.99" (the usual case) converts directly
+    if s[:1] != "." and s.replace(".", "", 1).isdecimal():
+        return float(s)
+    match = _NUMBER_RX.search(s)
+    return float(match.group()) if match else None
+
+
+_INSERT_HISTORY = """INSERT INTO price_history
+   (product_id, price, list_price, discount_pct, in_stock,
+    seller, shipping, deal_badge, coupon)
+   VALUES """
+_HISTORY_ROW = "(?, ?, ?, ?, ?, ?, ?, ?, ?)"
+
+# Rows per multi-row INSERT: 500, or fewer on SQLite builds older than
+# 3.32 whose limit is 999 bound parameters per statement.
+_MAX_VARIABLES = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+HISTORY_CHUNK = min(500, _MAX_VARIABLES // 9)
+
+# Product pages open at once per site in check_all; kept low so a refresh
+# doesn't look like a burst of bot traffic.
+SITE_CONCURRENCY = 4
+
+# (site, product_id) pairs per lookup query; 2 parameters each keeps us under
+# SQLite's default 999-variable limit.
+LOOKUP_CHUNK = 400
+
+_INSERT_ALERT = """INSERT INTO alerts (product_id, alert_type, message, old_value, new_value)
+   VALUES (?, ?, ?, ?, ?)"""
+
+
+# Fixed fields of each alert type; _check_alerts fills in the rest.
+_TPL_PRICE_DROP = {"type": "price_drop"}
+_TPL_BACK_IN_STOCK = {
+    "type": "back_in_stock",
+    "message": "Product is back in stock!",
+    "old_value": "out_of_stock",
+    "new_value": "in_stock",
+}
+_TPL_DEAL = {"type": "deal", "old_value": None}
+
+
+def _check_alerts(data: dict, current_price: float | None, threshold: float, prev) -> list:
+    """Check for alert conditions against the previous observation."""
+    alerts = []
+    if not prev:
+        return alerts
+
+    in_stock, deal_badge = data.get("in_stock"), data.get("deal_badge")
+    prev_price, prev_stock, prev_deal = prev["price"], prev["in_stock"], prev["deal_badge"]
+
+    # Price drop alert
+    if current_price and prev_price and current_price < prev_price:
+        drop_pct = ((prev_price - current_price) / prev_price) * 100
+        if drop_pct >= threshold:
+            alerts.append({
+                **_TPL_PRICE_DROP,
+                "message": f"Price dropped {drop_pct:.1f}%: ${prev_price:.2f} → ${current_price:.2f}",
+                "old_value": str(prev_price),
+                "new_value": str(current_price),
+            })
+
+    # Back in stock
+    if in_stock and not prev_stock:
+        alerts.append(dict(_TPL_BACK_IN_STOCK))
+
+    # Deal alert
+    if deal_badge and not prev_deal:
+        alerts.append({**_TPL_DEAL, "message": f"New deal: {deal_badge}", "new_value": deal_badge})
+
+    return alerts
+
+
+def _alert_row(db_id: int, alert: dict) -> tuple:
+    return (db_id, alert["type"], alert["message"], alert["old_value"], alert["new_value"])
 
 
 class PriceTracker:
@@ -41,12 +116,12 @@ class PriceTracker:
                 self.conn.commit()
             return {"success": True, "product_db_id": row["id"], "action": "reactivated" if not row["active"] else "already_tracking"}
 
-        self.conn.execute(
+        cursor = self.conn.execute(
             "INSERT INTO products (site, product_id, title, url) VALUES (?, ?, ?, ?)",
             (site, product_id, title, url)
         )
         self.conn.commit()
-        db_id = self.conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        db_id = cursor.lastrowid
         return {"success": True, "product_db_id": db_id, "action": "started"}
 
     def untrack(self, site: str, product_id: str) -> dict:
@@ -60,119 +135,114 @@ class PriceTracker:
 
     def record_price(self, site: str, product_id: str, data: dict) -> dict:
         """Record a price observation and check for alerts."""
-        cursor = self.conn.execute(
-            "SELECT id, title, alert_threshold FROM products WHERE site = ? AND product_id = ?",
-            (site, product_id)
-        )
-        row = cursor.fetchone()
-        if not row:
-            return {"success": False, "error": "Product not tracked"}
+        return self.record_prices_bulk([(site, product_id, data)])[0]
 
-        db_id = row["id"]
-        threshold = row["alert_threshold"]
+    def record_prices_bulk(self, items: list) -> list:
+        """Record several price observations in one transaction.
 
-        # Update title if we have one now
-        if data.get("title") and not row["title"]:
-            self.conn.execute(
-                "UPDATE products SET title = ? WHERE id = ?",
-                (data["title"], db_id)
-            )
-
-        price_val = _parse_price(data.get("price"))
-        list_price_val = _parse_price(data.get("list_price"))
+        Args:
+            items: (site, product_id, data) tuples, as passed to record_price
 
-        self.conn.execute(
-            """INSERT INTO price_history
-               (product_id, price, list_price, discount_pct, in_stock,
-                seller, shipping, deal_badge, coupon)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            (
-                db_id, price_val, list_price_val,
-                data.get("discount_pct"),
-                1 if data.get("in_stock") else 0,
-                data.get("seller"), data.get("shipping"),
-                data.get("deal_badge"), data.get("coupon"),
+        Returns one record_price-style result per item, in order.
+        """
+        results = []
+        titles, rows, alert_rows = [], [], []
+        products = self._lookup_products([(site, product_id) for site, product_id, _ in items])
+        for site, product_id, data in items:
+            row = products.get((site, product_id))
+            if not row:
+                results.append({"success": False, "error": "Product not tracked"})
+                continue
+
+            # Update title if we have one now
+            if data.get("title") and not row["title"]:
+                titles.append((data["title"], row["id"]))
+
+            # The lookup row carries the latest observation's columns too
+            prev = row if row["prev_id"] is not None else None
+            history_row, alerts = self._prepare_row(row["id"], row["alert_threshold"], data, prev)
+            rows.append(history_row)
+            alert_rows.extend(_alert_row(row["id"], a) for a in alerts)
+            results.append({"success": True, "price": history_row[1], "alerts": alerts})
+
+        self._flush(rows, alert_rows, titles)
+        return results
+
+    def _lookup_products(self, keys: list) -> dict:
+        """Fetch products and their latest observation for (site, product_id) keys.
+
+        One query per LOOKUP_CHUNK keys instead of two per product. Each row
+        has the product's id, title and alert_threshold, plus price,
+        in_stock and deal_badge from its newest price_history row (prev_id
+        is NULL when there is none).
+        """
+        found = {}
+        keys = list(dict.fromkeys(keys))
+        for start in range(0, len(keys), LOOKUP_CHUNK):
+            chunk = keys[start:start + LOOKUP_CHUNK]
+            placeholders = ", ".join(["(?, ?)"] * len(chunk))
+            cursor = self.conn.execute(
+                f"""SELECT p.id, p.site, p.product_id, p.title, p.alert_threshold,
+                           h.id AS prev_id, h.price, h.in_stock, h.deal_badge
+                    FROM products p
+                    LEFT JOIN price_history h ON h.id = (
+                        SELECT id FROM price_history
+                        WHERE product_id = p.id
+                        ORDER BY recorded_at DESC, id DESC LIMIT 1)
+                    WHERE (p.site, p.product_id) IN (VALUES {placeholders})""",
+                [v for key in chunk for v in key]
             )
-        )
-        self.conn.commit()
+            for row in cursor:
+                found[(row["site"], row["product_id"])] = row
+        return found
 
-        # Check for alerts
-        alerts = self._check_alerts(db_id, data, price_val, threshold)
-        return {"success": True, "price": price_val, "alerts": alerts}
+    @staticmethod
+    def _prepare_row(db_id: int, threshold: float, data: dict, prev) -> tuple:
+        """Build the price_history row and any alerts for one observation.
 
-    def _check_alerts(self, db_id: int, data: dict, current_price: float | None, threshold: float) -> list:
-        """Check for alert conditions against previous observations."""
-        alerts = []
-
-        # Get previous observation
-        prev = self.conn.execute(
-            """SELECT price, in_stock, deal_badge FROM price_history
-               WHERE product_id = ? ORDER BY recorded_at DESC LIMIT 1 OFFSET 1""",
-            (db_id,)
-        ).fetchone()
+        Pure: `prev` is the latest earlier observation (or None) and nothing
+        is written. Returns (history_row, alerts).
+        """
+        price_val = _parse_price(data.get("price"))
+        history_row = (
+            db_id, price_val, _parse_price(data.get("list_price")),
+            data.get("discount_pct"),
+            1 if data.get("in_stock") else 0,
+            data.get("seller"), data.get("shipping"),
+            data.get("deal_badge"), data.get("coupon"),
+        )
+        return history_row, _check_alerts(data, price_val, threshold, prev)
 
-        if not prev:
-            return alerts
-
-        # Price drop alert
-        if current_price and prev["price"] and current_price < prev["price"]:
-            drop_pct = ((prev["price"] - current_price) / prev["price"]) * 100
-            if drop_pct >= threshold:
-                alert = {
-                    "type": "price_drop",
-                    "message": f"Price dropped {drop_pct:.1f}%: ${prev['price']:.2f} → ${current_price:.2f}",
-                    "old_value": str(prev["price"]),
-                    "new_value": str(current_price),
-                }
+    def _flush(self, rows: list, alert_rows: list, titles: list = ()):
+        """Write prepared rows in a single transaction."""
+        if not (rows or alert_rows or titles):
+            return
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            if titles:
+                self.conn.executemany("UPDATE products SET title = ? WHERE id = ?", titles)
+            # One multi-row INSERT per chunk: a single statement to parse
+            # and step instead of one per row.
+            for start in range(0, len(rows), HISTORY_CHUNK):
+                chunk = rows[start:start + HISTORY_CHUNK]
                 self.conn.execute(
-                    "INSERT INTO alerts (product_id, alert_type, message, old_value, new_value) VALUES (?, ?, ?, ?, ?)",
-                    (db_id, alert["type"], alert["message"], alert["old_value"], alert["new_value"])
+                    _INSERT_HISTORY + ", ".join([_HISTORY_ROW] * len(chunk)),
+                    [v for row in chunk for v in row]
                 )
-                alerts.append(alert)
-
-        # Back in stock
-        if data.get("in_stock") and not prev["in_stock"]:
-            alert = {
-                "type": "back_in_stock",
-                "message": "Product is back in stock!",
-                "old_value": "out_of_stock",
-                "new_value": "in_stock",
-            }
-            self.conn.execute(
-                "INSERT INTO alerts (product_id, alert_type, message, old_value, new_value) VALUES (?, ?, ?, ?, ?)",
-                (db_id, alert["type"], alert["message"], alert["old_value"], alert["new_value"])
-            )
-            alerts.append(alert)
-
-        # Deal alert
-        if data.get("deal_badge") and not prev["deal_badge"]:
-            alert = {
-                "type": "deal",
-                "message": f"New deal: {data['deal_badge']}",
-                "old_value": None,
-                "new_value": data["deal_badge"],
-            }
-            self.conn.execute(
-                "INSERT INTO alerts (product_id, alert_type, message, old_value, new_value) VALUES (?, ?, ?, ?, ?)",
-                (db_id, alert["type"], alert["message"], alert["old_value"], alert["new_value"])
-            )
-            alerts.append(alert)
-
-        if alerts:
+            if alert_rows:
+                self.conn.executemany(_INSERT_ALERT, alert_rows)
             self.conn.commit()
-        return alerts
+        except Exception:
+            self.conn.rollback()
+            raise
 
     def get_history(self, site: str, product_id: str, days: int = 30) -> dict:
         """Get price history with summary stats."""
-        cursor = self.conn.execute(
-            "SELECT id, title FROM products WHERE site = ? AND product_id = ?",
-            (site, product_id)
-        )
-        row = cursor.fetchone()
+        row = self._product_row(site, product_id)
         if not row:
             return {"success": False, "error": "Product not tracked"}
 
-        db_id = row["id"]
+        window = f"-{days} days"
         entries = self.conn.execute(
             """SELECT price, list_price, discount_pct, in_stock, seller,
                       shipping, deal_badge, coupon, recorded_at
@@ -180,29 +250,61 @@ class PriceTracker:
                WHERE product_id = ?
                  AND recorded_at >= datetime('now', ?)
                ORDER BY recorded_at DESC""",
-            (db_id, f"-{days} days")
+            (row["id"], window)
         ).fetchall()
 
-        history = [dict(e) for e in entries]
-        prices = [e["price"] for e in entries if e["price"] is not None]
-
-        summary = {}
-        if prices:
-            summary = {
-                "min": min(prices),
-                "max": max(prices),
-                "avg": round(sum(prices) / len(prices), 2),
-                "current": prices[0] if prices else None,
-                "observations": len(entries),
-            }
+        return {
+            "success": True,
+            "site": site,
+            "product_id": product_id,
+            "title": row["title"],
+            "summary": self._summary(row["id"], window),
+            "history": [dict(e) for e in entries],
+        }
 
+    def get_history_summary(self, site: str, product_id: str, days: int = 30) -> dict:
+        """Get summary stats only, without transferring the history rows."""
+        row = self._product_row(site, product_id)
+        if not row:
+            return {"success": False, "error": "Product not tracked"}
         return {
             "success": True,
             "site": site,
             "product_id": product_id,
             "title": row["title"],
-            "summary": summary,
-            "history": history,
+            "summary": self._summary(row["id"], f"-{days} days"),
+        }
+
+    def _product_row(self, site: str, product_id: str):
+        return self.conn.execute(
+            "SELECT id, title FROM products WHERE site = ? AND product_id = ?",
+            (site, product_id)
+        ).fetchone()
+
+    def _summary(self, db_id: int, window: str) -> dict:
+        """min/max/avg/current price over a window, aggregated by SQLite.
+
+        Empty when the window has no priced observations.
+        """
+        stats = self.conn.execute(
+            """SELECT MIN(price) AS min, MAX(price) AS max, AVG(price) AS avg,
+                      COUNT(price) AS priced, COUNT(*) AS observations,
+                      (SELECT price FROM price_history
+                       WHERE product_id = ?1 AND recorded_at >= datetime('now', ?2)
+                         AND price IS NOT NULL
+                       ORDER BY recorded_at DESC, id DESC LIMIT 1) AS current
+               FROM price_history
+               WHERE product_id = ?1 AND recorded_at >= datetime('now', ?2)""",
+            (db_id, window)
+        ).fetchone()
+        if not stats["priced"]:
+            return {}
+        return {
+            "min": stats["min"],
+            "max": stats["max"],
+            "avg": round(stats["avg"], 2),
+            "current": stats["current"],
+            "observations": stats["observations"],
         }
 
     def get_alerts(self, unack_only: bool = True) -> dict:
@@ -236,7 +338,8 @@ class PriceTracker:
     def get_tracked_products(self) -> list:
         """Get all actively tracked products."""
         rows = self.conn.execute(
-            "SELECT site, product_id, title, url FROM products WHERE active = 1"
+            """SELECT site, product_id, title, url, last_price, last_recorded_at
+               FROM products WHERE active = 1"""
         ).fetchall()
         return [dict(r) for r in rows]
 
@@ -248,33 +351,65 @@ class PriceTracker:
         """
         products = self.get_tracked_products()
         results = []
+        adapters = []
+
+        # One adapter per site, fetching all of that site's products in one
+        # bulk_check_price call (concurrent tabs on a shared browser). Sites
+        # are independent, so they are fetched at the same time.
+        by_site = {}
+        for i, p in enumerate(products):
+            by_site.setdefault(p["site"], []).append(i)
 
-        for p in products:
+        async def fetch_site(site, indexes):
             try:
-                adapter = adapter_factory(p["site"])
-                data = await adapter.check_price(p["product_id"])
-                if data.get("success"):
-                    record = self.record_price(p["site"], p["product_id"], data)
-                    results.append({
-                        "site": p["site"],
-                        "product_id": p["product_id"],
-                        "title": data.get("title", p.get("title")),
-                        "price": data.get("price"),
-                        "alerts": record.get("alerts", []),
-                    })
-                else:
-                    results.append({
-                        "site": p["site"],
-                        "product_id": p["product_id"],
-                        "error": data.get("error"),
-                    })
+                adapter = adapter_factory(site)
+                adapters.append(adapter)
+                return await adapter.bulk_check_price(
+                    [products[i]["product_id"] for i in indexes],
+                    concurrency=SITE_CONCURRENCY,
+                )
             except Exception as e:
+                return [{"success": False, "error": str(e)}] * len(indexes)
+
+        batches = await asyncio.gather(
+            *(fetch_site(site, indexes) for site, indexes in by_site.items())
+        )
+        fetched = [None] * len(products)
+        for indexes, batch in zip(by_site.values(), batches):
+            for i, data in zip(indexes, batch):
+                fetched[i] = data
+
+        ok = [i for i, data in enumerate(fetched) if data.get("success")]
+        try:
+            records = dict(zip(ok, self.record_prices_bulk(
+                [(products[i]["site"], products[i]["product_id"], fetched[i]) for i in ok]
+            )))
+        except Exception as e:
+            records = {i: {"success": False, "error": str(e)} for i in ok}
+
+        for i, (p, data) in enumerate(zip(products, fetched)):
+            record = records.get(i)
+            if record is not None and record.get("success"):
                 results.append({
                     "site": p["site"],
                     "product_id": p["product_id"],
-                    "error": str(e),
+                    "title": data.get("title", p.get("title")),
+                    "price": data.get("price"),
+                    "alerts": record.get("alerts", []),
+                })
+            else:
+                results.append({
+                    "site": p["site"],
+                    "product_id": p["product_id"],
+                    "error": (record or data).get("error"),
                 })
 
+        # bulk_check_price schedules each adapter's browser close in the
+        # background so results come back first; make sure every close has
+        # finished before returning.
+        for adapter in adapters:
+            await adapter.wait_closed()
+
         return {
             "success": True,
             "checked": len(results),
@@ -282,4 +417,6 @@ class PriceTracker:
         }
 
     def close(self):
-        self.conn.close()
+        # The connection is shared per thread (see get_connection), so leave
+        # it open for the next tracker; just make sure nothing is pending.
+        self.conn.commit()
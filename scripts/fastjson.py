@@ -0,0 +1,44 @@
+"""
+fastjson — JSON encoding/decoding with orjson when it is installed.
+
+orjson is an optional speedup; without it the stdlib json module is used and
+behaviour is the same.
+"""
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+import json
+
+if orjson is not None:
+    loads = orjson.loads
+
+    def dumps(obj) -> str:
+        """Compact JSON text for `obj`."""
+        return orjson.dumps(obj).decode()
+
+    def dumpb(obj) -> bytes:
+        """Compact JSON for `obj` as UTF-8 bytes (socket framing)."""
+        return orjson.dumps(obj)
+
+    def pretty(obj) -> str:
+        """Indented JSON for output; unknown types are written with str()."""
+        return orjson.dumps(
+            obj, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        ).decode()
+else:
+    loads = json.loads
+
+    def dumps(obj) -> str:
+        """Compact JSON text for `obj`."""
+        return json.dumps(obj, separators=(",", ":"))
+
+    def dumpb(obj) -> bytes:
+        """Compact JSON for `obj` as UTF-8 bytes (socket framing)."""
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    def pretty(obj) -> str:
+        """Indented JSON for output; unknown types are written with str()."""
+        return json.dumps(obj, indent=2, default=str)
@@ -1,7 +1,8 @@
 """
 Session Pool Daemon — Keeps browser sessions warm for fast reuse.
 
-Architecture: Unix domain socket daemon managing a pool of browser instances.
+Architecture: Unix domain socket daemon managing one shared Chrome, with a
+separate browser context (cookies, storage) per domain.
 CLI ←→ Unix socket ←→ Daemon ←→ Chrome (nodriver)
 
 Usage:
@@ -14,9 +15,11 @@ import asyncio
 import json
 import os
 import signal
+import subprocess
 import sys
 import time
 import urllib.request
+from collections import OrderedDict
 from pathlib import Path
 
 # Add stealth-browser scripts to path
@@ -26,20 +29,38 @@ sys.path.insert(0, str(STEALTH_SCRIPTS))
 SCRIPTS_DIR = Path(__file__).parent
 sys.path.insert(0, str(SCRIPTS_DIR))
 
+import fastjson
+
 DATA_DIR = Path(__file__).parent.parent / "data"
 SOCKET_PATH = DATA_DIR / "pool.sock"
 PID_FILE = DATA_DIR / "pool.pid"
+LOG_FILE = DATA_DIR / "pool.log"
 
 IDLE_TIMEOUT = 300      # 5 minutes
 COOKIE_REFRESH = 600    # 10 minutes
+START_TIMEOUT = 5       # seconds `start` waits for the daemon's PID file
+HEALTH_TTL = 30         # skip the Chrome probe for sessions checked this recently
+
+
+def _probe_devtools(port: int):
+    """Raise unless Chrome's DevTools endpoint on `port` answers."""
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/json/version", timeout=2):
+        pass
 
 
 class SessionPool:
     """Manages a pool of browser sessions keyed by domain."""
 
     def __init__(self):
-        self.sessions = {}  # domain → {browser, page, last_used, created}
+        # domain → {browser, context_id, target_id, last_used, ...}, least
+        # recently used first
+        self.sessions = OrderedDict()
+        self._creating = {}  # domain → task starting its session
+        self._master = None  # the one Chrome all sessions share
+        self._master_lock = asyncio.Lock()
         self._running = True
+        self._shutdown_event = asyncio.Event()  # set once shutdown() has run
+        self._clients = set()  # writers of connected clients, closed on shutdown
 
     async def acquire(self, domain: str) -> dict:
         """Get or create a browser session for a domain."""
@@ -47,70 +68,140 @@ class SessionPool:
             session = self.sessions[domain]
             port = session["port"]
 
-            # Health check: verify Chrome is still alive
-            try:
-                urllib.request.urlopen(
-                    f"http://127.0.0.1:{port}/json/version", timeout=2
-                )
-            except Exception:
-                print(f"[pool] Stale session for {domain} (port {port}), recreating", file=sys.stderr)
-                await self._stop_session(session)
-                del self.sessions[domain]
-                return await self.acquire(domain)  # Recurse to create fresh
+            # Health check: verify Chrome is still alive (in a thread, so a
+            # hung Chrome doesn't stall every other client of the daemon).
+            # A session that passed a probe within HEALTH_TTL is trusted.
+            if time.time() - session.get("last_health_ok", 0) >= HEALTH_TTL:
+                try:
+                    await asyncio.to_thread(_probe_devtools, port)
+                except Exception:
+                    print(f"[pool] Stale session for {domain} (port {port}), recreating", file=sys.stderr)
+                    dead = session["browser"]
+                    if dead is self._master:
+                        # Chrome itself is gone, and every domain's context
+                        # with it: drop all sessions that lived on it.
+                        for other in [d for d, s in self.sessions.items() if s["browser"] is dead]:
+                            del self.sessions[other]
+                        await self._stop_master()
+                    elif self.sessions.get(domain) is session:
+                        del self.sessions[domain]
+                        await self._stop_session(session)
+                    return await self.acquire(domain)  # Recurse to create fresh
+                session["last_health_ok"] = time.time()
 
             session["last_used"] = time.time()
+            self.sessions.move_to_end(domain)
             print(f"[pool] Reusing session for {domain}", file=sys.stderr)
             return {
                 "success": True, "reused": True, "domain": domain,
                 "host": "127.0.0.1", "port": port,
+                "target_id": session["target_id"],
+                "browser_context_id": session["context_id"],
             }
 
-        # Create new session
+        # Create new session (shared with any prewarm already under way)
+        return await asyncio.shield(self._start_creating(domain))
+
+    def prewarm(self, domain: str) -> dict:
+        """Start creating a session for a domain without waiting for it."""
+        warming = domain not in self.sessions
+        if warming:
+            self._start_creating(domain)
+        return {"success": True, "domain": domain, "warming": warming}
+
+    def _start_creating(self, domain: str) -> asyncio.Task:
+        """Return the task creating `domain`'s session, starting it if needed."""
+        task = self._creating.get(domain)
+        if task is None:
+            task = asyncio.create_task(self._create_session(domain))
+            self._creating[domain] = task
+            task.add_done_callback(lambda _: self._creating.pop(domain, None))
+        return task
+
+    async def _create_session(self, domain: str) -> dict:
+        """Open an authenticated browser context for a domain and add it to the pool.
+
+        Every domain lives in the one shared Chrome (see _master_browser), in
+        its own browser context so cookies and storage stay separate.
+        """
         print(f"[pool] Creating new session for {domain}", file=sys.stderr)
         try:
-            from config import BROWSER_ARGS
             from chrome_cookies import extract_cookies as extract_chrome_cookies
             from base import inject_cookies
-            import nodriver as uc
-
-            cookie_result = extract_chrome_cookies([domain], decrypt=True)
+            from nodriver import cdp
+
+            # Cookie decryption runs in a thread while Chrome (if not yet
+            # running) launches.
+            cookie_result, browser = await asyncio.gather(
+                asyncio.to_thread(extract_chrome_cookies, [domain], decrypt=True),
+                self._master_browser(),
+            )
             if not cookie_result.get("success"):
                 return {"success": False, "error": "Cookie extraction failed"}
 
-            browser = await uc.start(headless=True, browser_args=BROWSER_ARGS)
-            page = await browser.get(f"https://www.{domain}")
-            await page.sleep(1)
-
-            await inject_cookies(browser, cookie_result["cookies"], domain)
+            context_id = await browser.connection.send(cdp.target.create_browser_context())
+            await inject_cookies(browser, cookie_result["cookies"], domain,
+                                 browser_context_id=context_id)
+            target_id = await browser.connection.send(cdp.target.create_target(
+                f"https://www.{domain}", browser_context_id=context_id
+            ))
 
             port = browser.config.port
             now = time.time()
             self.sessions[domain] = {
                 "browser": browser,
-                "page": page,
+                "context_id": context_id,
+                "target_id": target_id,
                 "port": port,
                 "last_used": now,
                 "created": now,
                 "cookies_refreshed": now,
+                "last_health_ok": now,
             }
 
             return {
                 "success": True, "reused": False, "domain": domain,
                 "host": "127.0.0.1", "port": port,
+                "target_id": target_id, "browser_context_id": context_id,
             }
 
         except Exception as e:
             return {"success": False, "error": str(e)}
 
+    async def _master_browser(self):
+        """The Chrome shared by every session, started on first use."""
+        async with self._master_lock:
+            if self._master is None:
+                from config import BROWSER_ARGS
+                import nodriver as uc
+
+                self._master = await uc.start(headless=True, browser_args=BROWSER_ARGS)
+            return self._master
+
     async def release(self, domain: str) -> dict:
         """Mark a session as available (no-op — session stays in pool)."""
         if domain in self.sessions:
             self.sessions[domain]["last_used"] = time.time()
+            self.sessions.move_to_end(domain)
         return {"success": True}
 
     async def _stop_session(self, session: dict):
-        """Safely stop a browser session — disconnect WebSocket, then kill process if we own it."""
+        """Close a session's browser context; the shared Chrome keeps running."""
         browser = session.get("browser")
+        if not browser:
+            return
+        try:
+            from nodriver import cdp
+
+            await browser.connection.send(
+                cdp.target.dispose_browser_context(session["context_id"])
+            )
+        except Exception:
+            pass
+
+    async def _stop_master(self):
+        """Safely stop the shared Chrome — disconnect WebSocket, then kill the process."""
+        browser, self._master = self._master, None
         if not browser:
             return
         try:
@@ -126,37 +217,57 @@ class SessionPool:
 
     async def cleanup_idle(self):
         """Remove sessions idle for too long."""
+        # sessions is kept in least-recently-used order, so the idle ones
+        # are at the front and the scan stops at the first active session.
         now = time.time()
-        to_remove = []
-        for domain, session in self.sessions.items():
-            if now - session["last_used"] > IDLE_TIMEOUT:
-                to_remove.append(domain)
-
-        for domain in to_remove:
-            print(f"[pool] Cleaning up idle session: {domain}", file=sys.stderr)
-            await self._stop_session(self.sessions[domain])
+        while self.sessions:
+            domain, session = next(iter(self.sessions.items()))
+            if now - session["last_used"] <= IDLE_TIMEOUT:
+                break
             del self.sessions[domain]
+            print(f"[pool] Cleaning up idle session: {domain}", file=sys.stderr)
+            await self._stop_session(session)
+
+        # Don't keep a Chrome running for nobody (unless a session is being
+        # created on it right now).
+        if not self.sessions and not self._creating and self._master:
+            print("[pool] No sessions left, stopping Chrome", file=sys.stderr)
+            await self._stop_master()
 
     async def refresh_cookies(self):
         """Re-inject fresh cookies into long-running sessions."""
         now = time.time()
-        for domain, session in self.sessions.items():
-            if now - session.get("cookies_refreshed", 0) > COOKIE_REFRESH:
-                try:
-                    from chrome_cookies import extract_cookies as extract_chrome_cookies
-                    from base import inject_cookies
-
-                    cookie_result = extract_chrome_cookies([domain], decrypt=True)
-                    if cookie_result.get("success"):
-                        await inject_cookies(
-                            session["browser"],
-                            cookie_result["cookies"],
-                            domain
-                        )
-                        session["cookies_refreshed"] = now
-                        print(f"[pool] Refreshed cookies for {domain}", file=sys.stderr)
-                except Exception as e:
-                    print(f"[pool] Cookie refresh failed for {domain}: {e}", file=sys.stderr)
+        due = [
+            domain for domain, session in self.sessions.items()
+            if now - session.get("cookies_refreshed", 0) > COOKIE_REFRESH
+        ]
+        if not due:
+            return
+
+        # One extraction (one pass over Chrome's cookie DB and keychain) for
+        # every due domain; inject_cookies picks each domain's own cookies.
+        try:
+            from chrome_cookies import extract_cookies as extract_chrome_cookies
+            from base import inject_cookies
+
+            cookie_result = await asyncio.to_thread(extract_chrome_cookies, due, decrypt=True)
+        except Exception as e:
+            print(f"[pool] Cookie refresh failed for {', '.join(due)}: {e}", file=sys.stderr)
+            return
+        if not cookie_result.get("success"):
+            return
+
+        for domain in due:
+            session = self.sessions.get(domain)
+            if session is None:
+                continue  # stopped while cookies were being extracted
+            try:
+                await inject_cookies(session["browser"], cookie_result["cookies"], domain,
+                                     browser_context_id=session["context_id"])
+                session["cookies_refreshed"] = now
+                print(f"[pool] Refreshed cookies for {domain}", file=sys.stderr)
+            except Exception as e:
+                print(f"[pool] Cookie refresh failed for {domain}: {e}", file=sys.stderr)
 
     def status(self) -> dict:
         """Get pool status."""
@@ -174,48 +285,69 @@ class SessionPool:
         }
 
     async def shutdown(self):
-        """Stop all sessions."""
+        """Stop all sessions and disconnect clients."""
         self._running = False
-        for domain, session in list(self.sessions.items()):
-            await self._stop_session(session)
-        self.sessions.clear()
+        try:
+            for domain, session in list(self.sessions.items()):
+                await self._stop_session(session)
+            self.sessions.clear()
+            await self._stop_master()
+        finally:
+            # Kept-open client connections would otherwise hold the server
+            # (Server.wait_closed waits for them on 3.12.1+) until IDLE_TIMEOUT.
+            for writer in list(self._clients):
+                writer.close()
+            self._shutdown_event.set()
 
 
 async def handle_client(reader, writer, pool):
-    """Handle a client connection."""
-    try:
-        data = await asyncio.wait_for(reader.readline(), timeout=5)
-        if not data:
-            return
+    """Handle a client connection.
 
-        request = json.loads(data.decode().strip())
-        action = request.get("action")
-
-        if action == "acquire":
-            response = await pool.acquire(request["domain"])
-        elif action == "release":
-            response = await pool.release(request["domain"])
-        elif action == "status":
-            response = pool.status()
-        elif action == "shutdown":
-            response = {"success": True, "message": "Shutting down"}
-            writer.write(json.dumps(response).encode() + b"\n")
-            await writer.drain()
-            writer.close()
-            await pool.shutdown()
-            return
-        else:
-            response = {"success": False, "error": f"Unknown action: {action}"}
+    Clients send newline-delimited JSON requests and may keep the connection
+    open for several of them; each is answered in order. The connection ends
+    on EOF, after IDLE_TIMEOUT without a request, or on shutdown.
+    """
+    pool._clients.add(writer)
+    try:
+        while True:
+            async with asyncio.timeout(IDLE_TIMEOUT):
+                data = await reader.readline()
+            if not data:
+                return
 
-        writer.write(json.dumps(response).encode() + b"\n")
-        await writer.drain()
-    except Exception as e:
-        try:
-            writer.write(json.dumps({"success": False, "error": str(e)}).encode() + b"\n")
+            request = {}
+            try:
+                request = fastjson.loads(data)
+                action = request.get("action")
+
+                if action == "acquire":
+                    response = await pool.acquire(request["domain"])
+                elif action == "release":
+                    response = await pool.release(request["domain"])
+                elif action == "prewarm":
+                    response = pool.prewarm(request["domain"])
+                elif action == "status":
+                    response = pool.status()
+                elif action == "shutdown":
+                    response = {"success": True, "message": "Shutting down"}
+                    writer.write(fastjson.dumpb(response) + b"\n")
+                    await writer.drain()
+                    writer.close()
+                    await pool.shutdown()
+                    return
+                else:
+                    response = {"success": False, "error": f"Unknown action: {action}"}
+            except Exception as e:
+                response = {"success": False, "error": str(e)}
+
+            if isinstance(request, dict) and request.get("noreply"):
+                continue
+            writer.write(fastjson.dumpb(response) + b"\n")
             await writer.drain()
-        except Exception:
-            pass
+    except Exception:
+        pass  # idle timeout or client went away
     finally:
+        pool._clients.discard(writer)
         try:
             writer.close()
             await writer.wait_closed()
@@ -226,7 +358,12 @@ async def handle_client(reader, writer, pool):
 async def maintenance_loop(pool):
     """Periodic maintenance: cleanup idle sessions, refresh cookies."""
     while pool._running:
-        await asyncio.sleep(30)
+        try:
+            async with asyncio.timeout(30):
+                await pool._shutdown_event.wait()
+            return
+        except TimeoutError:
+            pass
         await pool.cleanup_idle()
         await pool.refresh_cookies()
 
@@ -246,8 +383,11 @@ async def run_daemon():
         path=str(SOCKET_PATH)
     )
 
-    # Write PID file
-    PID_FILE.write_text(str(os.getpid()))
+    # Write PID file atomically: cmd_start polls for it and must never read a
+    # half-written file.
+    tmp = PID_FILE.with_suffix(".pid.tmp")
+    tmp.write_text(str(os.getpid()))
+    os.replace(tmp, PID_FILE)
 
     # Handle signals
     loop = asyncio.get_event_loop()
@@ -262,8 +402,7 @@ async def run_daemon():
 
     try:
         async with server:
-            while pool._running:
-                await asyncio.sleep(1)
+            await pool._shutdown_event.wait()
     finally:
         maintenance.cancel()
         if SOCKET_PATH.exists():
@@ -281,25 +420,32 @@ def send_command(action: str, **kwargs) -> dict:
         return {"success": False, "error": "Daemon not running (no socket)"}
 
     try:
-        s = sock.socket(sock.AF_UNIX, sock.SOCK_STREAM)
-        s.connect(str(SOCKET_PATH))
-        request = json.dumps({"action": action, **kwargs})
-        s.sendall(request.encode() + b"\n")
-
-        response = b""
-        while True:
-            chunk = s.recv(4096)
-            if not chunk:
-                break
-            response += chunk
-            if b"\n" in response:
-                break
-        s.close()
-        return json.loads(response.decode().strip())
+        with sock.socket(sock.AF_UNIX, sock.SOCK_STREAM) as s:
+            s.connect(str(SOCKET_PATH))
+            s.sendall(fastjson.dumpb({"action": action, **kwargs}) + b"\n")
+            # Replies are one JSON line, the same framing handle_client reads
+            with s.makefile("rb") as f:
+                response = f.readline()
+        return fastjson.loads(response)
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 
+def notify(action: str, **kwargs) -> bool:
+    """Send a command to the running daemon, which sends no reply."""
+    import socket as sock
+
+    if not SOCKET_PATH.exists():
+        return False
+    try:
+        with sock.socket(sock.AF_UNIX, sock.SOCK_STREAM) as s:
+            s.connect(str(SOCKET_PATH))
+            s.sendall(fastjson.dumpb({"action": action, "noreply": True, **kwargs}) + b"\n")
+        return True
+    except OSError:
+        return False
+
+
 def cmd_start() -> dict:
     """Start the daemon. Returns dict (caller handles JSON output)."""
     if PID_FILE.exists():
@@ -310,22 +456,26 @@ def cmd_start() -> dict:
         except ProcessLookupError:
             PID_FILE.unlink()
 
-    # Fork to background
-    pid = os.fork()
-    if pid > 0:
-        # Parent — wait briefly to confirm startup
-        time.sleep(1)
+    # Launch the daemon as a fresh interpreter in its own session, rather
+    # than forking this process (and its interpreter/event-loop state).
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    with open(LOG_FILE, "ab") as log:
+        proc = subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), "_run_daemon"],
+            start_new_session=True,
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=log,
+        )
+
+    # Wait for the daemon to write its PID file, polling with backoff
+    delay, deadline = 0.02, time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
         if PID_FILE.exists():
             return {"success": True, "pid": int(PID_FILE.read_text().strip())}
-        else:
-            return {"success": False, "error": "Daemon failed to start"}
-
-    # Child — become daemon
-    os.setsid()
-    sys.stdin = open(os.devnull, 'r')
-    sys.stdout = open(os.devnull, 'w')
-    # Keep stderr for logging
-    asyncio.run(run_daemon())
+        if proc.poll() is not None:
+            break  # exited during startup
+        time.sleep(delay)
+        delay = min(delay * 2, 0.2)
+    return {"success": False, "error": f"Daemon failed to start (see {LOG_FILE})"}
 
 
 def cmd_stop():
@@ -364,8 +514,10 @@ def main():
     cmd = sys.argv[1]
     if cmd == "start":
         result = cmd_start()
-        if result:  # None in child (daemon) process
-            print(json.dumps(result, indent=2))
+        print(json.dumps(result, indent=2))
+    elif cmd == "_run_daemon":
+        # Internal: the process cmd_start() launches
+        asyncio.run(run_daemon())
     elif cmd == "stop":
         cmd_stop()
     elif cmd == "status":
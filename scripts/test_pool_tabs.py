@@ -0,0 +1,115 @@
+"""
+Pool tab routing tests.
+
+The pool daemon shares one Chrome across sites, giving each site its own
+browser context and tab. A pooled adapter must navigate the tab it was handed
+(by target id), never the browser's first tab, which belongs to another
+context.
+
+Usage: python -m unittest test_pool_tabs   (from scripts/)
+"""
+
+import asyncio
+import sys
+import types
+import unittest
+from unittest import mock
+
+import base
+
+
+class FakeTab:
+    def __init__(self, target_id: str):
+        self.target = types.SimpleNamespace(target_id=target_id)
+        self.visited = []
+
+    async def get(self, url: str):
+        self.visited.append(url)
+        return self
+
+
+class FakeBrowser:
+    """Mimics nodriver: Browser.get() without new_tab drives the first tab."""
+
+    def __init__(self, tabs: list):
+        self.tabs = tabs
+
+    async def get(self, url: str, new_tab: bool = False):
+        return await self.tabs[0].get(url)
+
+    async def update_targets(self):
+        pass
+
+
+class PooledShopper(base.ShopperBase):
+    DOMAIN = "example.com"
+    DISPLAY_NAME = "Example"
+
+    async def evaluate(self, js: str, **kwargs):
+        return {}
+
+    async def search(self, query: str, limit: int = 5):
+        raise NotImplementedError
+
+    async def check_price(self, product_id: str):
+        raise NotImplementedError
+
+    async def product_details(self, product_id: str):
+        raise NotImplementedError
+
+    async def _check_price_on_page(self, page, product_id: str, screenshot: str = None):
+        raise NotImplementedError
+
+
+class PooledNavigationTest(unittest.TestCase):
+    def setUp(self):
+        self.master_tab = FakeTab("master")
+        self.site_tab = FakeTab("site")
+        browser = FakeBrowser([self.master_tab, self.site_tab])
+
+        nodriver = types.ModuleType("nodriver")
+        nodriver.Config = lambda **kwargs: kwargs
+        nodriver.Browser = types.SimpleNamespace(create=mock.AsyncMock(return_value=browser))
+        reply = {"success": True, "host": "127.0.0.1", "port": 9222,
+                 "target_id": "site", "browser_context_id": "ctx"}
+        for patcher in (
+            mock.patch.dict(sys.modules, {"nodriver": nodriver}),
+            mock.patch.object(base._pool, "rpc", mock.AsyncMock(return_value=reply)),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def _pooled_shopper(self):
+        shopper = PooledShopper()
+        shopper.browser, shopper.page = await shopper._acquire_from_pool()
+        return shopper
+
+    def test_acquire_uses_tab_for_target_id(self):
+        shopper = asyncio.run(self._pooled_shopper())
+        self.assertIs(shopper.page, self.site_tab)
+
+    def test_navigate_until_uses_pool_tab(self):
+        async def run():
+            shopper = await self._pooled_shopper()
+            await shopper.navigate_until("https://example.com/s?k=gpu", "#results")
+            return shopper
+
+        shopper = asyncio.run(run())
+        self.assertEqual(self.site_tab.visited, ["https://example.com/s?k=gpu"])
+        self.assertEqual(self.master_tab.visited, [])
+        self.assertIs(shopper.page, self.site_tab)
+
+    def test_nav_and_eval_uses_pool_tab(self):
+        async def run():
+            shopper = await self._pooled_shopper()
+            await shopper._nav_and_eval("https://example.com/dp/X1", "({})", "#title")
+            return shopper
+
+        shopper = asyncio.run(run())
+        self.assertEqual(self.site_tab.visited, ["https://example.com/dp/X1"])
+        self.assertEqual(self.master_tab.visited, [])
+        self.assertIs(shopper.page, self.site_tab)
+
+
+if __name__ == "__main__":
+    unittest.main()